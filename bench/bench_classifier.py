@@ -0,0 +1,63 @@
+"""
+Compares block_to_block_type with the previous regex-per-call classifier on a
+corpus of mixed block types.
+
+    python3 bench/bench_classifier.py [--repeat N]
+"""
+import os
+import re
+import sys
+import timeit
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from markdown_split import BlockType, block_to_block_type
+
+
+def reference_block_to_block_type(block):
+    # The classifier as it was before it was rewritten, kept for comparison
+    if re.match(r'^#{1,6}\s.*$', block):
+        return BlockType.HEADING
+    if re.match(r'^```.*```$', block, re.DOTALL):
+        return BlockType.CODE
+    lines = block.split('\n')
+    if all(line.startswith('>') for line in lines if line.strip()):
+        return BlockType.QUOTE
+    if all(line.startswith('-') for line in lines if line.strip()):
+        return BlockType.UNORDERED_LIST
+    list_numbering = 1
+    for line in lines:
+        if not line.startswith(str(list_numbering) + ". "):
+            return BlockType.PARAGRAPH
+        list_numbering += 1
+    return BlockType.ORDERED_LIST
+
+
+CORPUS = [
+    "## A section heading",
+    "```python\n" + "print('hello')\n" * 20 + "```",
+    "> A quote\n> spanning\n> a few lines",
+    "\n".join(f"- item {i}" for i in range(20)),
+    "\n".join(f"{i}. step {i}" for i in range(1, 21)),
+    "A paragraph of prose\nthat wraps over\nseveral lines of text.",
+    "- almost a list\n- but then\nplain text",
+] * 50
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    for block in CORPUS:
+        assert block_to_block_type(block) == reference_block_to_block_type(block)
+    reference = min(timeit.repeat(lambda: [reference_block_to_block_type(b) for b in CORPUS], number=args.repeat, repeat=3))
+    current = min(timeit.repeat(lambda: [block_to_block_type(b) for b in CORPUS], number=args.repeat, repeat=3))
+    per_block = 1e6 / (args.repeat * len(CORPUS))
+    print(f"reference  {reference * per_block:.2f}us/block")
+    print(f"current    {current * per_block:.2f}us/block  ({reference / current:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
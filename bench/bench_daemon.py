@@ -0,0 +1,134 @@
+"""
+Compares the render daemon with the one-shot CLI on a synthetic site: the latency
+of a rebuild after a one-page edit, of rendering a batch of documents, and the
+throughput of concurrent render requests.
+
+    python3 bench/bench_daemon.py [--pages 1000] [--triggers 10] [--jobs 2]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import socket
+import argparse
+import tempfile
+import statistics
+import subprocess
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(BENCH_DIR), "src")
+sys.path.insert(0, BENCH_DIR)
+
+import corpus
+
+# One-shot rendering: a fresh interpreter per batch, as a webhook handler shelling out would
+RENDER_SCRIPT = """
+import sys, json
+import render
+docs = json.load(sys.stdin)
+json.dump([result[:3] for result in render.render_many(docs)], sys.stdout)
+"""
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+def post(url, body):
+    request = urllib.request.Request(url, data=json.dumps(body).encode(), method="POST")
+    with urllib.request.urlopen(request) as response:
+        return json.load(response)
+
+
+def timed(fn, repeat, setup=None):
+    times = []
+    for i in range(repeat):
+        if setup is not None:
+            setup(i)
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def report(name, times):
+    times = sorted(times)
+    p95 = times[min(len(times) - 1, int(len(times) * 0.95))]
+    print(f"{name:<32}{statistics.median(times) * 1e3:>10.1f}ms p50{p95 * 1e3:>10.1f}ms p95")
+
+
+def start_daemon(root, port, jobs):
+    process = subprocess.Popen([sys.executable, os.path.join(root, "src", "daemon.py"),
+                                "--port", str(port), "--jobs", str(jobs)],
+                               cwd=root, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://localhost:{port}/status"):
+                return process
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("render daemon did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--triggers", type=int, default=10, help="rebuilds and render batches timed per mode")
+    parser.add_argument("--batch", type=int, default=50, help="documents per render request")
+    parser.add_argument("--concurrency", type=int, default=8, help="parallel clients in the throughput run")
+    parser.add_argument("--jobs", "-j", type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        # The build writes next to its own src/, so both modes run on a copy
+        shutil.copytree(SRC_DIR, os.path.join(root, "src"), ignore=shutil.ignore_patterns("__pycache__", "test_*"))
+        paths = corpus.generate_site(root, args.pages)
+        docs = []
+        for i, path in enumerate(paths[:args.batch]):
+            with open(path) as f:
+                docs.append([i, f.read()])
+        cli = [sys.executable, os.path.join(root, "src", "main.py"), "--incremental", "--jobs", str(args.jobs)]
+        subprocess.run(cli, cwd=root, check=True, capture_output=True)
+
+        def edit(i):
+            with open(paths[i % len(paths)], "a") as f:
+                f.write(f"\nEdit number {i}.\n")
+
+        report("cli rebuild after one edit", timed(
+            lambda: subprocess.run(cli, cwd=root, check=True, capture_output=True), args.triggers, edit))
+        report(f"cli render {len(docs)} docs", timed(
+            lambda: subprocess.run([sys.executable, "-c", RENDER_SCRIPT], cwd=os.path.join(root, "src"),
+                                   input=json.dumps(docs), text=True, check=True, capture_output=True),
+            args.triggers))
+
+        port = free_port()
+        daemon = start_daemon(root, port, args.jobs)
+        try:
+            url = f"http://localhost:{port}"
+            report("daemon rebuild after one edit", timed(lambda: post(f"{url}/build", {}), args.triggers, edit))
+            report(f"daemon render {len(docs)} docs", timed(lambda: post(f"{url}/render", {"docs": docs}),
+                                                           args.triggers))
+
+            requests = args.triggers * args.concurrency
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.concurrency) as clients:
+                list(clients.map(lambda _: post(f"{url}/render", {"docs": docs}), range(requests)))
+            elapsed = time.perf_counter() - start
+            print(f"daemon throughput, {args.concurrency} clients{requests * len(docs) / elapsed:>10.0f} docs/s")
+            with urllib.request.urlopen(f"{url}/status") as response:
+                print(f"daemon status: {json.load(response)}")
+        finally:
+            daemon.terminate()
+            daemon.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Measures how long importing the build modules takes, using python -X importtime
+in a fresh interpreter per run, and lists the slowest imports it pulls in.
+
+    python3 bench/bench_import.py [--repeat N] [--top N] [module ...]
+"""
+import os
+import sys
+import argparse
+import subprocess
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(PROJECT_ROOT, "src")
+
+
+def import_times(module):
+    """Returns {imported module: (self_us, cumulative_us)} for one fresh import of module."""
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               cwd=SRC_DIR, capture_output=True, text=True, check=True)
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=["main", "markdown_split"])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--top", type=int, default=10, help="list this many of the slowest imports")
+    args = parser.parse_args()
+
+    before = set(os.listdir(PROJECT_ROOT))
+    for module in args.modules:
+        runs = [import_times(module) for _ in range(args.repeat)]
+        best = min(runs, key=lambda times: times[module][1])
+        print(f"import {module:<20}{best[module][1] / 1e3:>8.1f}ms  (best of {args.repeat})")
+        heaviest = sorted(best.items(), key=lambda item: item[1][1], reverse=True)
+        for name, (self_us, cumulative_us) in heaviest[1:args.top + 1]:
+            print(f"    {name:<32}{cumulative_us / 1e3:>8.1f}ms cumulative{self_us / 1e3:>8.1f}ms self")
+    created = set(os.listdir(PROJECT_ROOT)) - before
+    if created:
+        # Importing must not write anything; setup belongs in main.cli()
+        print(f"import created files: {', '.join(sorted(created))}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""
+Compares the chained splitter pipeline with the single-pass inline tokenizer.
+
+    python3 bench/bench_inline.py [--repeat N]
+"""
+import os
+import sys
+import timeit
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import markdown_split as ms
+
+SAMPLES = {
+    "plain": "Just a long sentence without any inline markup at all, repeated. " * 20,
+    "inline_heavy": (
+        "Some **bold** text, some _italic_ text, `inline code`, "
+        "an ![image](/images/tom.png) and a [link](/blog/tom). "
+    ) * 20,
+    "links": "See [this page](/blog/glorfindel) and [that one](/blog/majesty). " * 20,
+    "long_links": "See [this page](/blog/glorfindel) and [that one](/blog/majesty). " * 250,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'sample':<14}{'chained':>12}{'single_pass':>14}{'speedup':>10}")
+    for name, text in SAMPLES.items():
+        assert ms.text_to_textnodes_chained(text) == ms.text_to_textnodes_single_pass(text)
+        chained = min(timeit.repeat(lambda: ms.text_to_textnodes_chained(text), number=args.repeat, repeat=3))
+        single = min(timeit.repeat(lambda: ms.text_to_textnodes_single_pass(text), number=args.repeat, repeat=3))
+        print(f"{name:<14}{chained * 1e6 / args.repeat:>10.1f}us{single * 1e6 / args.repeat:>12.1f}us{chained / single:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
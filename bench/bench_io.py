@@ -0,0 +1,91 @@
+"""
+Compares page I/O through text-mode files with the pageio layer on a synthetic
+corpus: reading every markdown file, writing every page as many small fragments
+the way Template.render_into does, and reading a few large files.
+
+    python3 bench/bench_io.py [--files 100000] [--large-mb 32] [--repeat 3]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), "src"))
+
+import corpus
+import pageio
+
+
+def text_read(path):
+    with open(path, "r") as f:
+        return f.read()
+
+
+def text_write(path, fragments):
+    with open(path, "w") as f:
+        for fragment in fragments:
+            f.write(fragment)
+
+
+def atomic_write(path, fragments):
+    with pageio.AtomicWriter(path) as out:
+        for fragment in fragments:
+            out.write(fragment)
+
+
+def best_of(repeat, fn):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def report(name, seconds, count, size):
+    print(f"{name:<28}{seconds:>8.2f}s{count / seconds:>12.0f} files/s{size / seconds / 1e6:>10.1f} MB/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=100000)
+    parser.add_argument("--large-mb", type=int, default=32, help="size of each large file")
+    parser.add_argument("--large-files", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        paths = corpus.generate_site(root, args.files, static_files=0)
+        size = sum(os.path.getsize(path) for path in paths)
+        print(f"{len(paths)} markdown files, {size / 1e6:.1f} MB")
+
+        report("read text mode", best_of(args.repeat, lambda: [text_read(p) for p in paths]), len(paths), size)
+        report("read pageio", best_of(args.repeat, lambda: [pageio.read_text(p) for p in paths]), len(paths), size)
+
+        # One fragment per line, as template literals and rendered blocks arrive
+        pages = [(p[:-len("index.md")] + "index.html", pageio.read_text(p).splitlines(keepends=True))
+                 for p in paths]
+        report("write text mode", best_of(args.repeat, lambda: [text_write(*page) for page in pages]),
+               len(pages), size)
+        report("write pageio (atomic)", best_of(args.repeat, lambda: [atomic_write(*page) for page in pages]),
+               len(pages), size)
+
+        large = []
+        line = "A paragraph line of a very large page, with some *inline* markup.\n\n"
+        for i in range(args.large_files):
+            path = os.path.join(root, f"large-{i}.md")
+            with open(path, "w") as f:
+                f.write(line * (args.large_mb * 1024 * 1024 // len(line)))
+            large.append(path)
+        large_size = sum(os.path.getsize(path) for path in large)
+        report("large read text mode", best_of(args.repeat, lambda: [text_read(p) for p in large]),
+               len(large), large_size)
+        report("large read pageio (mmap)", best_of(args.repeat, lambda: [pageio.read_text(p) for p in large]),
+               len(large), large_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Measures memory and construction time of the slotted node classes against
+copies of the classes as they were before, each instance carrying a __dict__.
+
+    python3 bench/bench_nodes.py [--count N]
+"""
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from htmlnode import LeafNode, ParentNode
+from textnode import TextNode, TextType
+
+
+# Standalone copies of the classes as they were before __slots__, reduced to
+# their constructors. Subclassing the slotted classes instead would store the
+# attributes in the inherited slots and leave __dict__ empty.
+class DictHTMLNode():
+    def __init__(self, tag=None, value=None, children=None, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = children
+        self.props = props
+
+
+class DictLeafNode(DictHTMLNode):
+    def __init__(self, tag, value, props=None):
+        super().__init__(tag, value, props=props)
+
+
+class DictParentNode(DictHTMLNode):
+    def __init__(self, tag, children, props=None):
+        super().__init__(tag, None, children, props)
+
+
+class DictTextNode():
+    def __init__(self, text, text_type, url=None):
+        self.text = text
+        self.text_type = TextType(text_type)
+        self.url = url
+
+
+def build_text_nodes(cls, count):
+    return [cls("some text", TextType.BOLD) for _ in range(count)]
+
+
+def build_tree(leaf_cls, parent_cls, count):
+    return parent_cls("ul", [parent_cls("li", [leaf_cls("b", "item")]) for _ in range(count)])
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=100_000)
+    args = parser.parse_args()
+
+    cases = [
+        ("TextNode", (build_text_nodes, DictTextNode, args.count), (build_text_nodes, TextNode, args.count)),
+        ("Leaf/ParentNode tree", (build_tree, DictLeafNode, DictParentNode, args.count),
+         (build_tree, LeafNode, ParentNode, args.count)),
+    ]
+    print(f"{'case':<22}{'dict peak':>12}{'slots peak':>12}{'saved':>8}{'dict time':>12}{'slots time':>12}")
+    for name, with_dict, with_slots in cases:
+        dict_peak, dict_time = measure(*with_dict)
+        slots_peak, slots_time = measure(*with_slots)
+        print(f"{name:<22}{dict_peak / 2**20:>10.1f}MB{slots_peak / 2**20:>10.1f}MB"
+              f"{1 - slots_peak / dict_peak:>7.0%}{dict_time * 1e3:>10.1f}ms{slots_time * 1e3:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Generates synthetic site trees (content/, static/, template.html) for benchmarks.
+
+    python3 bench/corpus.py OUT_DIR [--pages 1000] [--profile mixed] [--seed 0]
+"""
+import os
+import random
+import argparse
+
+PROFILES = ("mixed", "inline", "list", "code")
+PAGES_PER_SECTION = 100
+
+TEMPLATE = """<!doctype html>
+<html>
+  <head>
+    <meta charset="utf-8" />
+    <title>{{ Title }}</title>
+    <link href="/index.css" rel="stylesheet" />
+  </head>
+
+  <body>
+    <article>{{ Content }}</article>
+  </body>
+</html>
+"""
+
+WORDS = (
+    "the ring of power was forged in the fires of mount doom and only there "
+    "could it be unmade while the fellowship walked south through the misty mountains"
+).split()
+
+
+def _words(rng, count):
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+
+def _inline_sentence(rng):
+    parts = [_words(rng, rng.randint(3, 8))]
+    for _ in range(rng.randint(1, 4)):
+        kind = rng.randrange(5)
+        if kind == 0:
+            parts.append(f"**{_words(rng, 2)}**")
+        elif kind == 1:
+            parts.append(f"_{_words(rng, 2)}_")
+        elif kind == 2:
+            parts.append(f"`{rng.choice(WORDS)}()`")
+        elif kind == 3:
+            parts.append(f"[{_words(rng, 2)}](/section-{rng.randrange(10)}/page-{rng.randrange(100)})")
+        else:
+            parts.append(f"![{_words(rng, 2)}](/images/image-{rng.randrange(10)}.png)")
+        parts.append(_words(rng, rng.randint(2, 6)))
+    return " ".join(parts) + "."
+
+
+def _paragraph(rng):
+    return "\n".join(_inline_sentence(rng) for _ in range(rng.randint(1, 4)))
+
+
+def _unordered_list(rng):
+    return "\n".join(f"- {_inline_sentence(rng)}" for _ in range(rng.randint(3, 12)))
+
+
+def _ordered_list(rng):
+    return "\n".join(f"{i}. {_inline_sentence(rng)}" for i in range(1, rng.randint(3, 12)))
+
+
+def _code(rng):
+    lines = [f"def {rng.choice(WORDS)}_{i}(x):\n    return x * {i}" for i in range(rng.randint(5, 40))]
+    return "```python\n" + "\n".join(lines) + "\n```"
+
+
+def _quote(rng):
+    return "\n".join(f"> {_inline_sentence(rng)}" for _ in range(rng.randint(1, 3)))
+
+
+_BLOCK_MIX = {
+    "mixed": [(_paragraph, 4), (_unordered_list, 2), (_ordered_list, 1), (_code, 1), (_quote, 1)],
+    "inline": [(_paragraph, 1)],
+    "list": [(_unordered_list, 3), (_ordered_list, 2)],
+    "code": [(_code, 3), (_paragraph, 1)],
+}
+
+
+def generate_page(rng, profile, title, blocks=12):
+    makers, weights = zip(*_BLOCK_MIX[profile])
+    body = [maker(rng) for maker in rng.choices(makers, weights, k=blocks)]
+    return f"# {title}\n\n" + "\n\n".join(body) + "\n"
+
+
+def generate_site(root, pages=1000, profile="mixed", seed=0, static_files=20, static_size=64 * 1024):
+    """
+    Writes a deterministic synthetic site below root and returns the markdown paths.
+
+    Pages are spread over sections of PAGES_PER_SECTION pages each, e.g.
+    content/section-3/page-42/index.md.
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"unknown profile: {profile}")
+    rng = random.Random(seed)
+    paths = []
+    for i in range(pages):
+        section, page = divmod(i, PAGES_PER_SECTION)
+        path = os.path.join(root, "content", f"section-{section}", f"page-{page}", "index.md")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(generate_page(rng, profile, f"Page {i}"))
+        paths.append(path)
+
+    images = os.path.join(root, "static", "images")
+    os.makedirs(images, exist_ok=True)
+    for i in range(static_files):
+        with open(os.path.join(images, f"image-{i}.png"), "wb") as f:
+            f.write(rng.randbytes(static_size))
+    with open(os.path.join(root, "static", "index.css"), "w") as f:
+        f.write("body { font-family: serif; }\n")
+    with open(os.path.join(root, "template.html"), "w") as f:
+        f.write(TEMPLATE)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("out_dir")
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--profile", choices=PROFILES, default="mixed")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--static-files", type=int, default=20)
+    args = parser.parse_args()
+    paths = generate_site(args.out_dir, args.pages, args.profile, args.seed, args.static_files)
+    print(f"Generated {len(paths)} pages in {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
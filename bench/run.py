@@ -0,0 +1,153 @@
+"""
+Runs the build benchmarks on a synthetic corpus and compares them to a baseline.
+
+    python3 bench/run.py [--pages 1000] [--profile mixed] [--save bench/baseline.json]
+    python3 bench/run.py --compare bench/baseline.json [--tolerance 0.15]
+
+--compare exits with status 1 when any benchmark is slower than the baseline by
+more than the tolerance.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), "src"))
+sys.path.insert(0, BENCH_DIR)
+
+import corpus
+import markdown_split as ms
+import main as site
+
+
+def best_of(repeat, fn, setup=None):
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run_benchmarks(root, paths, repeat):
+    documents = []
+    for path in paths:
+        with open(path) as f:
+            documents.append(f.read())
+    inline_texts = [
+        line.lstrip("-> ")
+        for document in documents
+        for block in ms.markdown_to_blocks(document)
+        if not block.startswith(("```", "#"))
+        for line in block.split("\n")
+    ]
+    trees = [ms.markdown_to_html_node(document) for document in documents]
+    template_path = os.path.join(root, "template.html")
+    out_dir = os.path.join(root, "public")
+
+    def reset_out_dir():
+        shutil.rmtree(out_dir, ignore_errors=True)
+        os.makedirs(out_dir)
+
+    def generate_pages():
+        for i, path in enumerate(paths):
+            site.generate_page(path, template_path, os.path.join(out_dir, f"{i}.html"))
+
+    return {
+        "text_to_textnodes": best_of(repeat, lambda: [ms.text_to_textnodes(t) for t in inline_texts]),
+        # The block cache would turn every repetition after the first into lookups
+        "markdown_to_html_node": best_of(repeat, lambda: [ms.markdown_to_html_node(d) for d in documents],
+                                         setup=ms.clear_block_cache),
+        "to_html": best_of(repeat, lambda: [tree.to_html() for tree in trees]),
+        "generate_page": best_of(repeat, generate_pages, setup=reset_out_dir),
+        "copy_all_files_recursive": best_of(
+            repeat, lambda: site.copy_all_files_recursive(os.path.join(root, "static"), out_dir),
+            setup=reset_out_dir),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Prints each benchmark against the baseline and returns the regressed names."""
+    regressions = []
+    print(f"{'benchmark':<28}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name, seconds in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"{name:<28}{'-':>12}{seconds * 1e3:>10.1f}ms")
+            continue
+        change = seconds / before - 1
+        flag = ""
+        if change > tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<28}{before * 1e3:>10.1f}ms{seconds * 1e3:>10.1f}ms{change:>+10.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--profile", choices=corpus.PROFILES, default="mixed")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--corpus", help="reuse (or create) the corpus in this directory")
+    parser.add_argument("--save", metavar="JSON", help="record the results as a baseline")
+    parser.add_argument("--compare", metavar="JSON", help="compare the results to a baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="allowed slowdown before a benchmark counts as regressed")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    tmp = None
+    root = args.corpus
+    if root is None:
+        tmp = tempfile.TemporaryDirectory()
+        root = tmp.name
+    content = os.path.join(root, "content")
+    if os.path.isdir(content):
+        paths = [page[0] for page in site.discover_pages(content, None, root)]
+    else:
+        paths = corpus.generate_site(root, args.pages, args.profile)
+
+    try:
+        results = run_benchmarks(root, paths, args.repeat)
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+    report = {
+        "meta": {
+            "pages": len(paths),
+            "profile": args.profile,
+            "repeat": args.repeat,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline["meta"].get("pages") != len(paths) or baseline["meta"].get("profile") != args.profile:
+            print(f"warning: baseline was recorded with {baseline['meta']}", file=sys.stderr)
+        regressions = compare(results, baseline["results"], args.tolerance)
+    else:
+        regressions = []
+        for name, seconds in results.items():
+            print(f"{name:<28}{seconds * 1e3:>10.1f}ms")
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
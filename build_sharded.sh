@@ -0,0 +1,21 @@
+#!/bin/sh
+# Builds the site as N shards in parallel processes, then merges them into public/.
+# On several machines, run "python3 src/main.py --shard I/N --build-id ID" on each,
+# gather their shards/ directories on one of them and run
+# "python3 src/main.py --merge-shards --build-id ID".
+N=${1:-4}
+# Every shard of this run is tagged with one id, so the merge never picks up a
+# manifest an earlier run (say with another N, or a shard that failed) left behind
+BUILD_ID="$(date +%Y%m%d%H%M%S)-$$"
+rm -rf shards
+pids=""
+i=0
+while [ "$i" -lt "$N" ]; do
+    python3 src/main.py --shard "$i/$N" --build-id "$BUILD_ID" &
+    pids="$pids $!"
+    i=$((i + 1))
+done
+for pid in $pids; do
+    wait "$pid" || exit 1
+done
+python3 src/main.py --merge-shards --build-id "$BUILD_ID"
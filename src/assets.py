@@ -0,0 +1,166 @@
+import os
+import shutil
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+LINK_MODES = ("copy", "hardlink", "reflink")
+
+
+class SyncResult():
+    def __init__(self):
+        self.outputs = {}  # destination path -> source path, for every file in the tree
+        self.copied = []
+        self.skipped = []
+        self.failed = []
+
+    def __repr__(self):
+        return (f"SyncResult(copied={len(self.copied)}, skipped={len(self.skipped)}, "
+                f"failed={len(self.failed)})")
+
+
+def scan_files(source_dir, dest_dir):
+    """
+    Yields (source DirEntry, destination path) for every file below source_dir.
+
+    Uses os.scandir so the file type (and, on most platforms, the stat data) comes
+    from the directory listing itself instead of extra isfile/isdir calls.
+    """
+    stack = [(source_dir, dest_dir)]
+    while stack:
+        source, dest = stack.pop()
+        with os.scandir(source) as entries:
+            for entry in entries:
+                dest_path = os.path.join(dest, entry.name)
+                if entry.is_dir():
+                    stack.append((entry.path, dest_path))
+                elif entry.is_file():
+                    yield entry, dest_path
+
+
+def is_up_to_date(source_stat, dest_path):
+    """A destination with the same size and mtime as its source is left alone."""
+    try:
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return False
+    return dest_stat.st_size == source_stat.st_size and dest_stat.st_mtime_ns == source_stat.st_mtime_ns
+
+
+def _copy(source_path, dest_path):
+    shutil.copy2(source_path, dest_path)
+
+
+def _hardlink(source_path, dest_path):
+    # The destination shares the source's inode: no bytes are copied, but editing
+    # a file under public/ in place also edits the one under static/
+    try:
+        if os.path.lexists(dest_path):
+            os.remove(dest_path)
+        os.link(source_path, dest_path)
+    except OSError:
+        # Different filesystems or no hardlink support
+        shutil.copy2(source_path, dest_path)
+
+
+def _reflink(source_path, dest_path):
+    # copy_file_range copies inside the kernel and shares extents on
+    # filesystems that support reflinks (btrfs, XFS)
+    try:
+        with open(source_path, "rb") as src, open(dest_path, "wb") as dst:
+            remaining = os.fstat(src.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+        shutil.copystat(source_path, dest_path)
+    except (OSError, AttributeError):
+        shutil.copy2(source_path, dest_path)
+
+
+_TRANSFERS = {
+    "copy": _copy,
+    "hardlink": _hardlink,
+    "reflink": _reflink,
+}
+
+
+def copy_file(source_path, dest_path, mode="copy"):
+    """Places a single file at dest_path using the given link mode."""
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    _TRANSFERS[mode](source_path, dest_path)
+
+
+def sync_assets(source_dir, dest_dir, mode="copy", jobs=None, include=None):
+    """
+    Mirrors every file below source_dir into dest_dir.
+
+    Files whose destination already has the same size and mtime are skipped, the
+    rest are copied, hardlinked or reflinked (see mode) on a thread pool. Copying
+    releases the GIL, so threads overlap the file I/O.
+
+    Args:
+        source_dir (str): Directory to copy from, e.g. static/.
+        dest_dir (str): Directory to copy into, e.g. public/.
+        mode (str): One of "copy", "hardlink" or "reflink".
+        jobs (int | None): Worker threads, None lets the executor decide.
+        include (callable | None): Called with each file's path relative to
+            source_dir; files it returns False for are left out entirely.
+
+    Returns:
+        SyncResult: Every destination file and what happened to it.
+    """
+    if mode not in _TRANSFERS:
+        raise ValueError(f"invalid link mode: {mode}")
+    transfer = _TRANSFERS[mode]
+    result = SyncResult()
+    pending = []
+    created_dirs = set()
+    for entry, dest_path in scan_files(source_dir, dest_dir):
+        if include is not None and not include(os.path.relpath(entry.path, source_dir)):
+            continue
+        result.outputs[dest_path] = entry.path
+        if is_up_to_date(entry.stat(), dest_path):
+            result.skipped.append(dest_path)
+            continue
+        parent = os.path.dirname(dest_path)
+        if parent not in created_dirs:
+            os.makedirs(parent, exist_ok=True)
+            created_dirs.add(parent)
+        pending.append((entry.path, dest_path))
+
+    def run(task):
+        source_path, dest_path = task
+        try:
+            transfer(source_path, dest_path)
+        except Exception as e:
+            logger.error("Failed to copy file %s: %s", source_path, e)
+            return dest_path, False
+        logger.debug("Copied file: %s -> %s", source_path, dest_path)
+        return dest_path, True
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            for dest_path, ok in executor.map(run, pending):
+                (result.copied if ok else result.failed).append(dest_path)
+    logger.info("Synced %s: %d copied, %d unchanged, %d failed",
+                source_dir, len(result.copied), len(result.skipped), len(result.failed))
+    return result
+
+
+def prune_extraneous(dest_dir, keep):
+    """
+    Removes every file below dest_dir that is not in keep, then any directory
+    left empty. Returns the removed file paths.
+    """
+    removed = []
+    for entry, _ in scan_files(dest_dir, dest_dir):
+        if entry.path not in keep:
+            os.remove(entry.path)
+            removed.append(entry.path)
+    for root, dirs, files in os.walk(dest_dir, topdown=False):
+        if root != dest_dir and not os.listdir(root):
+            os.rmdir(root)
+    return removed
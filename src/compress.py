@@ -0,0 +1,163 @@
+import os
+import gzip
+import logging
+import pageio
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Text formats worth compressing; images and fonts are compressed already
+COMPRESSIBLE_EXTENSIONS = (".html", ".css", ".js", ".mjs", ".json", ".svg", ".xml", ".txt", ".map")
+# Below this size the compressed response saves less than its own overhead
+MIN_SIZE = 256
+
+
+def _gzip(data):
+    # mtime=0 keeps the output identical across builds of the same input
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _brotli(data):
+    return brotli.compress(data, mode=brotli.MODE_TEXT, quality=11)
+
+
+ENCODERS = {".gz": _gzip}
+if brotli is not None:
+    ENCODERS[".br"] = _brotli
+# Every sibling extension a build may have written, whether or not brotli is installed now
+SIBLING_EXTENSIONS = (".gz", ".br")
+
+
+class CompressResult():
+    def __init__(self):
+        self.outputs = []  # every compressed sibling that now exists
+        self.written = []
+        self.skipped = []
+        self.failed = []
+
+    def __repr__(self):
+        return (f"CompressResult(written={len(self.written)}, skipped={len(self.skipped)}, "
+                f"failed={len(self.failed)})")
+
+
+def is_compressible(path, size):
+    return size >= MIN_SIZE and path.endswith(COMPRESSIBLE_EXTENSIONS)
+
+
+def is_fresh(sibling_path, source_stat):
+    """A compressed sibling newer than its source is left alone."""
+    try:
+        return os.stat(sibling_path).st_mtime_ns > source_stat.st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+
+def compress_file(path, extensions=None):
+    """
+    Writes the compressed siblings of path, e.g. index.html.gz and index.html.br,
+    for each of extensions (default: every available encoder). Siblings newer
+    than path are kept as they are.
+
+    A sibling that would not be smaller than path is not written, and removed if
+    an earlier build left one. Returns (written, kept) lists of sibling paths.
+    """
+    source_stat = os.stat(path)
+    data = None
+    written = []
+    kept = []
+    for extension in extensions or ENCODERS:
+        sibling_path = path + extension
+        if is_fresh(sibling_path, source_stat):
+            kept.append(sibling_path)
+            continue
+        if data is None:
+            with open(path, "rb") as f:
+                data = f.read()
+        compressed = ENCODERS[extension](data)
+        if len(compressed) >= len(data):
+            if os.path.exists(sibling_path):
+                os.remove(sibling_path)
+            continue
+        # Write and rename, so a server never sends a half-written sibling
+        with pageio.atomic_file(sibling_path, "wb") as f:
+            f.write(compressed)
+        written.append(sibling_path)
+    return written, kept
+
+
+def precompress(paths, jobs=None, extensions=None):
+    """
+    Writes .gz (and .br, when the brotli module is installed) siblings next to
+    every compressible file in paths, so a server can send precompressed bytes
+    without compressing anything per request.
+
+    zlib and brotli release the GIL while compressing, so the files are spread
+    over a thread pool. Siblings newer than their source are skipped.
+
+    Args:
+        paths (iterable): Output files to consider, e.g. every file in public/.
+        jobs (int | None): Worker threads, None lets the executor decide.
+        extensions (iterable | None): Sibling extensions to write, default all available.
+
+    Returns:
+        CompressResult: The siblings that exist afterwards, and which were written,
+        kept or failed.
+    """
+    result = CompressResult()
+    pending = []
+    for path in paths:
+        try:
+            size = os.path.getsize(path)
+        except FileNotFoundError:
+            continue
+        if is_compressible(path, size):
+            pending.append(path)
+
+    def run(path):
+        try:
+            return path, compress_file(path, extensions)
+        except Exception as e:
+            logger.error("Failed to compress %s: %s", path, e)
+            return path, None
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            for path, siblings in executor.map(run, pending):
+                if siblings is None:
+                    result.failed.append(path)
+                    continue
+                written, kept = siblings
+                result.written.extend(written)
+                result.skipped.extend(kept)
+                result.outputs.extend(written + kept)
+    logger.info("Precompressed %d files (%s): %d written, %d up to date, %d failed",
+                len(pending), ", ".join(extensions or ENCODERS), len(result.written),
+                len(result.skipped), len(result.failed))
+    return result
+
+
+def remove_siblings(paths, keep=()):
+    """
+    Removes the compressed siblings an earlier precompressing build left next
+    to the compressible files in paths, sparing any path in keep (an asset that
+    is itself named like a sibling, say). Returns the removed sibling paths.
+    """
+    removed = []
+    for path in paths:
+        if not path.endswith(COMPRESSIBLE_EXTENSIONS):
+            continue
+        for extension in SIBLING_EXTENSIONS:
+            sibling_path = path + extension
+            if sibling_path in keep:
+                continue
+            try:
+                os.remove(sibling_path)
+            except FileNotFoundError:
+                continue
+            removed.append(sibling_path)
+    return removed
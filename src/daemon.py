@@ -0,0 +1,269 @@
+"""
+A long-running render service: a localhost HTTP server in front of a warm,
+pre-forked worker pool, so webhook-triggered renders and rebuilds skip the
+interpreter startup, imports and logging setup of a fresh build.
+
+    python3 src/daemon.py [--port 8890] [--jobs N] [--queue-size 64]
+
+    POST /render  {"docs": [[id, markdown], ...]} -> {"results": [{"id", "title", "html", "error"}, ...]}
+    POST /build   {"full": false}                -> {"seconds": ..., "coalesced": ...}
+    GET  /status                                 -> worker, queue and job counters
+"""
+import os
+import json
+import time
+import signal
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import main as site
+import logs
+import render
+import templates
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8890
+DEFAULT_QUEUE_SIZE = 64
+RENDER_CHUNK_SIZE = 64
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+
+def _warm_worker(_):
+    # Runs once per worker so the first real job finds the parser, the block cache
+    # machinery and the site template already loaded
+    render.render_document("# Warm up\n\nA *paragraph* with a [link](/)")
+    if os.path.exists(site.TEMPLATE_PATH):
+        templates.load_template(site.TEMPLATE_PATH)
+    return os.getpid()
+
+
+class Overloaded(Exception):
+    """Raised when the service's job queue is full; the client should retry later."""
+
+
+class RenderService():
+    """
+    Runs render and build jobs on one process pool that lives as long as the service.
+
+    At most queue_size jobs are admitted at a time, running or waiting for a
+    worker; admit() refuses the rest, so a burst of requests is pushed back to
+    the clients instead of piling up in memory.
+
+    Builds run one at a time. A build request that arrives while another build is
+    running waits for the next build, and every request waiting by the time that
+    build starts shares it, so a burst of webhooks costs at most two builds.
+    """
+    def __init__(self, jobs=None, queue_size=DEFAULT_QUEUE_SIZE, cache=None):
+        self.workers = jobs or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.cache = cache
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, **logs.pool_options())
+        self.slots = threading.BoundedSemaphore(queue_size)
+        self.active = 0
+        self.completed = 0
+        self.rejected = 0
+        self.builds = 0
+        self._lock = threading.Lock()
+        self._build_done = threading.Condition(self._lock)
+        self._build_requested = 0  # sequence number of the latest build request
+        self._build_finished = 0   # latest request covered by a finished build
+        self._build_running = False
+        self._full_requested = False
+        self._build_result = None
+
+    def warm(self):
+        """Starts every worker and loads the parser and template in it."""
+        pids = set(self.executor.map(_warm_worker, range(self.workers)))
+        logger.info("Render service warmed %d workers", len(pids))
+
+    def admit(self):
+        """Takes a queue slot for a job, raising Overloaded when the queue is full."""
+        if not self.slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise Overloaded(f"queue full ({self.queue_size} jobs)")
+        with self._lock:
+            self.active += 1
+
+    def release(self):
+        with self._lock:
+            self.active -= 1
+            self.completed += 1
+        self.slots.release()
+
+    def render(self, docs):
+        """Renders (id, markdown) pairs on the pool and returns (id, title, html, error) tuples."""
+        docs = list(docs)
+        futures = [self.executor.submit(render.render_batch, docs[i:i + RENDER_CHUNK_SIZE])
+                   for i in range(0, len(docs), RENDER_CHUNK_SIZE)]
+        return [result for future in futures for result in future.result()]
+
+    def build(self, full=False):
+        """
+        Builds the site, incrementally unless full, with the pages rendered on the
+        pool. Returns (seconds, coalesced): how long the build that covered this
+        request took, and whether that build was shared with other requests.
+        """
+        with self._lock:
+            self._build_requested += 1
+            ticket = self._build_requested
+            self._full_requested = self._full_requested or full
+            while self._build_finished < ticket:
+                if self._build_running:
+                    self._build_done.wait()
+                    continue
+                # This request runs the build, on behalf of every request made so far
+                self._build_running = True
+                covers = self._build_requested
+                shared_by = covers - self._build_finished
+                full, self._full_requested = self._full_requested, False
+                self._lock.release()
+                start = time.perf_counter()
+                # What the waiting requests see if the build is cut short by a
+                # BaseException, which propagates in this thread only
+                result = (0.0, RuntimeError("build was interrupted"), shared_by)
+                try:
+                    self.run_build(full)
+                    result = (time.perf_counter() - start, None, shared_by)
+                except Exception as e:
+                    logger.error("Build failed: %s", e)
+                    result = (time.perf_counter() - start, e, shared_by)
+                finally:
+                    # However the build ended, the next request must not wait for it
+                    self._lock.acquire()
+                    self._build_running = False
+                    self._build_finished = covers
+                    self._build_result = result
+                    self.builds += 1
+                    self._build_done.notify_all()
+            seconds, error, shared_by = self._build_result
+        if error is not None:
+            raise error
+        return seconds, shared_by > 1
+
+    def run_build(self, full):
+        site.main(incremental=not full, jobs=self.workers, cache=self.cache, executor=self.executor)
+
+    def status(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "active": self.active,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "builds": self.builds,
+            }
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _send_json(self, status, body, headers=()):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            raise ValueError(f"request body over {MAX_BODY_BYTES} bytes")
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        if self.path != "/status":
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+            return
+        self._send_json(200, self.server.service.status())
+
+    def do_POST(self):
+        service = self.server.service
+        if self.path not in ("/render", "/build"):
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+            return
+        try:
+            service.admit()
+        except Overloaded as e:
+            self._send_json(503, {"error": str(e)}, headers=[("Retry-After", "1")])
+            return
+        # The response is sent only once the slot is free again, so a client that
+        # got its answer can always be admitted for its next request
+        try:
+            body = self._read_json()
+            if self.path == "/render":
+                results = service.render((doc_id, markdown) for doc_id, markdown in body["docs"])
+                status, response = 200, {"results": [
+                    {"id": doc_id, "title": title, "html": html, "error": None if error is None else str(error)}
+                    for doc_id, title, html, error in results
+                ]}
+            else:
+                seconds, coalesced = service.build(full=bool(body.get("full")))
+                status, response = 200, {"seconds": seconds, "coalesced": coalesced}
+        except (ValueError, KeyError, TypeError) as e:
+            status, response = 400, {"error": f"bad request: {e}"}
+        except Exception as e:
+            status, response = 500, {"error": str(e)}
+        finally:
+            service.release()
+        self._send_json(status, response)
+
+def make_server(service, host="localhost", port=DEFAULT_PORT):
+    """Returns an HTTP server answering requests with service; call serve_forever() to run it."""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+def parse_args(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Serve render and build jobs from a warm worker pool")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--jobs", "-j", type=site.job_count, default=0, metavar="N",
+                        help="worker processes (0 uses every core)")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE, metavar="N",
+                        help="jobs admitted at once; further requests get 503 until one finishes")
+    parser.add_argument("--render-cache", action="store_true",
+                        help="reuse rendered markdown from the on-disk render cache in builds")
+    parser.add_argument("--verbose", "-v", action="store_true", help="log every request and page")
+    return parser.parse_args(argv)
+
+
+def cli(argv=None):
+    args = parse_args(argv)
+    build_log, _ = site.start_logging()
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+    cache = (site.RENDER_CACHE_PATH, 256 * 1024 * 1024) if args.render_cache else None
+    service = RenderService(jobs=args.jobs or None, queue_size=args.queue_size, cache=cache)
+    try:
+        service.warm()
+        server = make_server(service, args.host, args.port)
+        # Stop cleanly on SIGTERM too; shutdown() waits for serve_forever, so it
+        # cannot run on the thread the signal interrupts
+        signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+        logger.info("Render service listening on http://%s:%d/", args.host, server.server_address[1])
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        server.server_close()
+    finally:
+        service.close()
+        build_log.stop()
+
+
+if __name__ == "__main__":
+    cli()
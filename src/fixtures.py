@@ -0,0 +1,22 @@
+import os
+import tempfile
+import unittest
+
+
+class TempDirTestCase(unittest.TestCase):
+    """A TestCase that runs every test in a fresh temporary directory, self.root."""
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+
+    def write(self, rel, data, root=None):
+        """
+        Writes data, str or bytes, to rel below root (default self.root), creating
+        missing directories, and returns the file's path.
+        """
+        path = os.path.join(self.root if root is None else root, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb" if isinstance(data, bytes) else "w") as f:
+            f.write(data)
+        return path
@@ -1,4 +1,27 @@
+# Verbatim text is escaped in slices of this many characters, so a huge code
+# sample is never copied whole
+ESCAPE_CHUNK_SIZE = 64 * 1024
+
+
+def escape_text(text):
+    """
+    HTML-escapes &, < and > like html.escape(text, quote=False). A character that
+    does not occur costs one fast scan instead of a replace, and text with nothing
+    to escape is returned as it is.
+    """
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    return text
+
+
 class HTMLNode():
+    # Millions of nodes are created per build, slots keep each one small
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
@@ -6,6 +29,17 @@ class HTMLNode():
         self.props = props
 
     def to_html(self):
+        parts = []
+        self.render_into(parts.append)
+        return "".join(parts)
+
+    def render_into(self, write):
+        """
+        Renders the node by passing its HTML fragments, in order, to write.
+
+        write can be list.append, a file's write method or any callable taking a
+        string, so a whole tree is rendered in one walk and joined (or written) once.
+        """
         raise Exception(NotImplementedError)
     
     def props_to_html(self):
@@ -20,8 +54,13 @@ class HTMLNode():
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
-        super().__init__(tag, value, props=props)
+        self.tag = tag
+        self.value = value
+        self.children = None
+        self.props = props
     
     def to_html(self):
         if self.value is None:
@@ -30,18 +69,66 @@ class LeafNode(HTMLNode):
             return self.value
         return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
 
+    def render_into(self, write):
+        if self.value is None:
+            raise Exception(ValueError)
+        if self.tag is None or len(self.tag) == 0:
+            write(self.value)
+            return
+        write(f"<{self.tag}{self.props_to_html()}>")
+        write(self.value)
+        write(f"</{self.tag}>")
+
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
-        super().__init__(tag, None, children, props)
+        self.tag = tag
+        self.value = None
+        self.children = children
+        self.props = props
     
-    def to_html(self):
-         if self.tag is None or len(self.tag) == 0:
+    def render_into(self, write):
+        if self.tag is None or len(self.tag) == 0:
             raise Exception(ValueError)
-         if self.children is None or len(self.children) == 0:
-             raise Exception(ValueError, "missing children value")
-         result = ""
-         for item in self.children:
-            result += item.to_html()
-         return f"<{self.tag}>{result}</{self.tag}>"
-    
\ No newline at end of file
+        if self.children is None or len(self.children) == 0:
+            raise Exception(ValueError, "missing children value")
+        write(f"<{self.tag}>")
+        for item in self.children:
+            item.render_into(write)
+        write(f"</{self.tag}>")
+
+
+class CodeNode(HTMLNode):
+    """
+    A <code> element whose text is the span source[start:end], written HTML-escaped
+    straight from source without copying the span out first. source is typically
+    the whole fenced block, so a code sample costs no string of its own until it
+    is rendered.
+    """
+    __slots__ = ("source", "start", "end")
+
+    def __init__(self, source, start=0, end=None):
+        self.tag = "code"
+        self.value = None
+        self.children = None
+        self.props = None
+        self.source = source
+        self.start = start
+        self.end = len(source) if end is None else end
+
+    @property
+    def text(self):
+        return self.source[self.start:self.end]
+
+    def render_into(self, write):
+        write("<code>")
+        # One pass over the span, a chunk at a time
+        source, end = self.source, self.end
+        for start in range(self.start, end, ESCAPE_CHUNK_SIZE):
+            write(escape_text(source[start:min(start + ESCAPE_CHUNK_SIZE, end)]))
+        write("</code>")
+
+    def __repr__(self):
+        return f"CodeNode(text={self.text!r})"
@@ -0,0 +1,38 @@
+import os
+from sitegraph import resolve_url
+
+
+def is_served(rel_path, outputs, dest_dir):
+    """
+    Whether a static file server answers rel_path from the built outputs: either the
+    file itself or, for a directory URL such as /blog/tom, its index.html.
+    """
+    target = os.path.normpath(os.path.join(dest_dir, rel_path))
+    return target in outputs or os.path.join(target, "index.html") in outputs
+
+
+def check_links(index, outputs, dest_dir):
+    """
+    Finds the internal links and images that point at nothing the build produced.
+
+    index maps each page's output path to the ("a", href) and ("img", src) targets
+    collected while it was rendered; outputs is the set of every file written to
+    dest_dir, pages and copied static files alike. Each distinct target costs one
+    set lookup, so no generated HTML has to be read back.
+
+    Returns the dangling references as sorted (page, tag, url) tuples.
+    """
+    dangling = []
+    # Most targets are root-relative and shared by many pages, so each is resolved once
+    broken = {}
+    for page, links in index.items():
+        page_dir = os.path.dirname(page)
+        for tag, url in set(links):
+            key = url if url.startswith("/") else (page_dir, url)
+            is_broken = broken.get(key)
+            if is_broken is None:
+                rel_path = resolve_url(url, page, dest_dir)
+                is_broken = broken[key] = rel_path is not None and not is_served(rel_path, outputs, dest_dir)
+            if is_broken:
+                dangling.append((page, tag, url))
+    return sorted(dangling)
@@ -0,0 +1,144 @@
+import sys
+import queue
+import logging
+import logging.handlers
+import multiprocessing
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+
+class BatchingHandler(logging.Handler):
+    """
+    Formats records into a buffer and writes each batch to every stream with a
+    single write and flush, instead of one write and flush per record.
+
+    A batch is written when it reaches capacity, when a record at flush_level or
+    above arrives, and whenever flush() is called.
+    """
+    def __init__(self, streams, capacity=512, flush_level=logging.WARNING):
+        super().__init__()
+        self.streams = streams
+        self.capacity = capacity
+        self.flush_level = flush_level
+        self.buffer = []
+
+    def emit(self, record):
+        try:
+            self.buffer.append(self.format(record) + "\n")
+        except Exception:
+            self.handleError(record)
+            return
+        if len(self.buffer) >= self.capacity or record.levelno >= self.flush_level:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            if not self.buffer:
+                return
+            text = "".join(self.buffer)
+            self.buffer.clear()
+            for stream in self.streams:
+                stream.write(text)
+                stream.flush()
+
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """A QueueListener that flushes its handlers whenever the queue runs dry."""
+    def dequeue(self, block):
+        try:
+            return self.queue.get(block=False)
+        except queue.Empty:
+            for handler in self.handlers:
+                handler.flush()
+            return self.queue.get(block=block)
+
+
+class BuildLog():
+    """The running log pipeline: a queue fed by every process, drained by one thread."""
+    def __init__(self, listener, handler, log_file, queue_handler):
+        self.listener = listener
+        self.handler = handler
+        self.log_file = log_file
+        self.queue_handler = queue_handler
+
+    def stop(self):
+        """
+        Drains the queue, writes what is buffered and closes the log file. The
+        queue's feeder thread is joined, so no logging thread outlives the build.
+        """
+        global _queue
+        logging.getLogger().removeHandler(self.queue_handler)
+        self.listener.stop()
+        self.handler.flush()
+        self.listener.queue.close()
+        self.listener.queue.join_thread()
+        if _queue is self.listener.queue:
+            _queue = None
+        self.log_file.close()
+
+
+# The queue of the running BuildLog, handed to worker processes by pool_options()
+_queue = None
+
+
+def configure_logging(log_filepath, level=logging.INFO):
+    """
+    Routes all logging through a QueueHandler, so the build threads and worker
+    processes only enqueue records. A background listener formats them and
+    appends them in batches to log_filepath and stderr.
+
+    Returns the BuildLog, whose stop() must be called before exiting.
+    """
+    global _queue
+    # A multiprocessing queue, so page workers log through the same listener
+    log_queue = pool_context().Queue(-1)
+    log_file = open(log_filepath, "a")
+    handler = BatchingHandler([log_file, sys.stderr])
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    queue_handler = _install_queue_handler(log_queue, level)
+    listener = BatchingQueueListener(log_queue, handler)
+    listener.start()
+    _queue = log_queue
+    return BuildLog(listener, handler, log_file, queue_handler)
+
+
+def _install_queue_handler(log_queue, level):
+    root = logging.getLogger()
+    for old_handler in root.handlers[:]:
+        root.removeHandler(old_handler)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+    return queue_handler
+
+
+def init_worker(log_queue, level):
+    """Process pool initializer: sends the worker's log records to the parent's listener."""
+    _install_queue_handler(log_queue, level)
+
+
+def pool_context():
+    """
+    The multiprocessing context process pools start their workers in: a fork
+    server where there is one, spawning otherwise. Workers are not forked from
+    this process, as fork() could leave its logging threads in a broken state in
+    the child.
+    """
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
+
+
+def pool_options():
+    """
+    Keyword arguments for a ProcessPoolExecutor whose workers log through the
+    running BuildLog, if any:
+
+        ProcessPoolExecutor(max_workers=jobs, **logs.pool_options())
+
+    Workers start in pool_context(), so they inherit nothing from this process;
+    each is handed the log queue by its initializer instead.
+    """
+    options = {"mp_context": pool_context()}
+    if _queue is not None:
+        options.update(initializer=init_worker, initargs=(_queue, logging.getLogger().level))
+    return options
@@ -1,89 +1,586 @@
 import os
-import shutil
 import logging
-from datetime import datetime
+import itertools
+from functools import partial
+from contextlib import ExitStack
 import markdown_split as ms
+import assets
+import manifest
+import templates
+import profiling
+import sitegraph
+import linkcheck
+import pageio
+
+# Importing this module has no side effects: logging is set up by cli(), and modules
+# only some runs need (the process pool, the render cache, the watch server, argparse)
+# are imported where they are used, so tools, tests and spawned workers start fast
 
 PROJECT_ROOT = "/".join(os.path.dirname(__file__).split("/")[0:-1])
 STATIC_PATH = os.path.join(PROJECT_ROOT, "static")
 PUBLIC_PATH = os.path.join(PROJECT_ROOT, "public")
+CONTENT_PATH = os.path.join(PROJECT_ROOT, "content")
+TEMPLATE_PATH = os.path.join(PROJECT_ROOT, "template.html")
+MANIFEST_PATH = os.path.join(PROJECT_ROOT, ".build_manifest.json")
+RENDER_CACHE_PATH = os.path.join(PROJECT_ROOT, ".cache", "render")
+PROFILE_PATH = os.path.join(PROJECT_ROOT, "build_profile.json")
 LOG_DIR = os.path.join(PROJECT_ROOT, "log")
+SHARD_PATH = os.path.join(PROJECT_ROOT, "shards")
 
-# Create log directory if it doesn't exist
-os.makedirs(LOG_DIR, exist_ok=True)
+logger = logging.getLogger(__name__)
 
-# Create timestamp for log filename
-timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-log_filename = f"file_operations_{timestamp}.log"
-log_filepath = os.path.join(LOG_DIR, log_filename)
 
-# Configure logging to write to file
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_filepath),
-        logging.StreamHandler()  # Also log to console
-    ]
-)
+def main(incremental=False, jobs=1, link_mode="copy", cache=None, precompress=False, executor=None):
+    """
+    Builds the site into public/.
 
-logger = logging.getLogger(__name__)
+    cache is an optional (directory, max_bytes) pair enabling the persistent
+    render cache, so unchanged markdown is not parsed again. With precompress,
+    compressible outputs get .gz (and .br) siblings a server can send as they are.
+    executor is an optional running process pool the pages are rendered on.
+    """
+    if incremental:
+        incremental_build(jobs=jobs, link_mode=link_mode, cache=cache, precompress=precompress, executor=executor)
+        return
+
+    os.makedirs(PUBLIC_PATH, exist_ok=True)
+    logger.info("Ensured public directory exists: %s", PUBLIC_PATH)
+
+    # Instead of wiping public/, unchanged assets are kept and everything the
+    # build did not produce is pruned afterwards
+    with profiling.stage("asset copy"):
+        synced = assets.sync_assets(STATIC_PATH, PUBLIC_PATH, mode=link_mode)
+    with profiling.stage("discover"):
+        pages = site_pages()
+    index = generate_pages(pages, jobs=jobs, cache=cache, executor=executor)
+    keep = set(synced.outputs)
+    keep.update(dest_path for _, _, dest_path in pages)
+    report_broken_links(index, keep)
+    if precompress:
+        keep.update(precompress_outputs(keep).outputs)
+    removed = assets.prune_extraneous(PUBLIC_PATH, keep)
+    for path in removed:
+        logger.debug("Removed stale output: %s", path)
+    logger.info("Build: %d pages generated, %d stale outputs removed", len(pages), len(removed))
+    # A full build invalidates whatever an earlier incremental build recorded
+    if os.path.exists(MANIFEST_PATH):
+        os.remove(MANIFEST_PATH)
+
+
+def site_pages():
+    """Returns the (markdown, template, output) triples that make up the site"""
+    return discover_pages(CONTENT_PATH, TEMPLATE_PATH, PUBLIC_PATH)
+
+
+def discover_pages(content_dir, template_path, dest_dir):
+    """
+    Maps every markdown file below content_dir to its html output below dest_dir,
+    e.g. content/blog/tom/index.md -> public/blog/tom/index.html. Each page uses the
+    nearest section template.html under content_dir, or template_path otherwise.
+    """
+    pages = []
+    for root, dirs, files in os.walk(content_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if not name.endswith(".md"):
+                continue
+            from_path = os.path.join(root, name)
+            rel_path = os.path.relpath(from_path, content_dir)
+            dest_path = os.path.join(dest_dir, rel_path[:-len(".md")] + ".html")
+            pages.append((from_path, templates.template_for(from_path, content_dir, template_path), dest_path))
+    return pages
+
+
+def _open_render_cache(cache):
+    if cache is None:
+        return None
+    import render_cache
+    return render_cache.open_cache(*cache)
+
+
+def _generate_page_job(page, cache=None, profile=False):
+    # Each worker process opens the shared on-disk cache once
+    if profile:
+        profiling.enable()
+    links = generate_page(*page, cache=_open_render_cache(cache))
+    # Hand this page's links, and its stage timings, back to the parent process
+    return links, profiling.disable() if profile else None
+
+
+def generate_pages(pages, jobs=1, chunksize=None, cache=None, executor=None):
+    """
+    Generates every (from_path, template_path, dest_path) page and returns the
+    link index of the generated pages: {dest_path: [(tag, url), ...]}.
+
+    With jobs == 1 pages are rendered serially in this process; otherwise they are
+    fanned out over a process pool (jobs=None uses every core) in chunks, so the
+    per-task IPC cost is paid once per batch rather than once per page. Each worker
+    runs the same generate_page as the serial path, so outputs are byte-identical.
+
+    executor is an already running process pool to use instead of starting one,
+    such as the render daemon's warm workers; jobs then only sizes the chunks.
+    """
+    pages = list(pages)
+    index = {}
+    job = partial(_generate_page_job, cache=cache)
+    if len(pages) <= 1 or (jobs == 1 and executor is None):
+        for page in pages:
+            index[page[2]] = job(page)[0]
+        return index
+    workers = jobs or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, len(pages) // (workers * 4))
+    job = partial(_generate_page_job, cache=cache, profile=profiling.enabled())
+
+    def run(executor):
+        # Consume the iterator so exceptions raised in workers surface here
+        for page, (links, events) in zip(pages, executor.map(job, pages, chunksize=chunksize)):
+            index[page[2]] = links
+            if events:
+                profiling.add_events(events)
 
+    if executor is not None:
+        run(executor)
+        return index
+    import logs
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers, **logs.pool_options()) as executor:
+        run(executor)
+    return index
+
+
+def site_graph(pages=None):
+    """Returns the dependency graph of the site's pages"""
+    return sitegraph.build_graph(site_pages() if pages is None else pages, STATIC_PATH, PUBLIC_PATH)
+
+
+def generate_scheduled(graph, outputs, jobs=1, cache=None, executor=None):
+    """
+    Generates the given page outputs of graph, each after everything it depends on,
+    and returns their link index.
+    """
+    index = {}
+    for batch in graph.schedule(outputs):
+        index.update(generate_pages([graph.pages[output] for output in batch], jobs=jobs, cache=cache,
+                                    executor=executor))
+    return index
+
+
+def report_broken_links(index, outputs):
+    """
+    Logs a warning for every internal link or image in the link index that points
+    at none of the outputs, and returns the dangling (page, tag, url) references.
+    """
+    with profiling.stage("link check"):
+        dangling = linkcheck.check_links(index, outputs, PUBLIC_PATH)
+    for page, tag, url in dangling:
+        kind = "image" if tag == "img" else "link"
+        logger.warning("Broken %s in %s: %s", kind, os.path.relpath(page, PROJECT_ROOT), url)
+    logger.info("Link check: %d links in %d pages, %d broken",
+                sum(len(links) for links in index.values()), len(index), len(dangling))
+    return dangling
+
+
+def precompress_outputs(paths):
+    """Writes the compressed siblings of the given outputs, see compress.precompress."""
+    import compress
+    with profiling.stage("compress"):
+        return compress.precompress(paths)
+
+
+def incremental_build(manifest_path=MANIFEST_PATH, jobs=1, link_mode="copy", cache=None, precompress=False,
+                      executor=None):
+    """
+    Rebuilds only the outputs whose inputs changed since the previous build.
+
+    Every page input recorded in the site graph is fingerprinted once per build and
+    compared with the fingerprints recorded in the manifest next to public/.
+    Markdown and templates are hashed; static files, both the synced assets and the
+    images a page embeds, are compared by size and mtime, so large images are never
+    hashed. Outputs whose sources disappeared are removed.
+    """
+    old_outputs = manifest.load_manifest(manifest_path)
+    old_links = manifest.load_links(manifest_path)
+    new_outputs = {}
+    fingerprints = {}
+
+    def inputs_of(paths):
+        inputs = {}
+        for path in paths:
+            if path not in fingerprints:
+                if path.startswith(STATIC_PATH + os.sep):
+                    fingerprints[path] = manifest.file_signature(path)
+                else:
+                    fingerprints[path] = manifest.file_digest(path)
+            inputs[os.path.relpath(path, PROJECT_ROOT)] = fingerprints[path]
+        return inputs
 
-def main():
-    if os.path.exists(PUBLIC_PATH):
-        shutil.rmtree(PUBLIC_PATH)
     os.makedirs(PUBLIC_PATH, exist_ok=True)
-    logger.info(f"Ensured public directory exists: {PUBLIC_PATH}")
 
-    copy_all_files_recursive(STATIC_PATH, PUBLIC_PATH)
-    generate_page("content/index.md", "template.html", "public/index.html")
+    with profiling.stage("asset copy"):
+        synced = assets.sync_assets(STATIC_PATH, PUBLIC_PATH, mode=link_mode)
+    for dest_path, source_path in synced.outputs.items():
+        # Assets are only recorded so their outputs can be removed once the source
+        # is gone; sync_assets already decides what to copy
+        new_outputs[os.path.relpath(dest_path, PROJECT_ROOT)] = {os.path.relpath(source_path, PROJECT_ROOT): None}
+    copied = len(synced.copied)
 
+    dirty = []
+    with profiling.stage("discover"):
+        graph = site_graph()
+    # The graph hashed every markdown file while scanning it for images
+    fingerprints.update(graph.digests)
+    for dest_path, dependencies in graph.dependencies.items():
+        output = os.path.relpath(dest_path, PROJECT_ROOT)
+        inputs = inputs_of(dependencies)
+        new_outputs[output] = inputs
+        if manifest.needs_rebuild(old_outputs, output, inputs, dest_path):
+            dirty.append(dest_path)
+    index = generate_scheduled(graph, dirty, jobs=jobs, cache=cache, executor=executor)
+    generated = len(dirty)
+    # Pages that were not regenerated keep the links recorded when they last were
+    for dest_path in graph.pages.keys() - index.keys():
+        index[dest_path] = old_links.get(os.path.relpath(dest_path, PROJECT_ROOT), [])
+    outputs = {os.path.join(PROJECT_ROOT, output) for output in new_outputs}
+    report_broken_links(index, outputs)
+    up_to_date = len(new_outputs) - copied - generated
 
-def copy_all_files_recursive(source_dir, dest_dir):
+    if precompress:
+        # Siblings are recorded like any other output, so they are removed with
+        # their source or once precompression is turned off
+        for sibling_path in precompress_outputs(outputs).outputs:
+            source_path = sibling_path[:-len(os.path.splitext(sibling_path)[1])]
+            new_outputs[os.path.relpath(sibling_path, PROJECT_ROOT)] = {os.path.relpath(source_path, PROJECT_ROOT): None}
 
-    """Helper function for recursive copying with proper destination paths"""
-    for item in os.listdir(source_dir):
-        source_path = os.path.join(source_dir, item)
-        dest_path = os.path.join(dest_dir, item)
+    removed = 0
+    for output in old_outputs.keys() - new_outputs.keys():
+        manifest.remove_output(os.path.join(PROJECT_ROOT, output), PUBLIC_PATH)
+        logger.debug("Removed stale output: %s", output)
+        removed += 1
+    if not precompress and not old_outputs:
+        # Siblings an incremental build wrote are recorded outputs, removed above.
+        # Without a manifest, as after a full build (which records none), a full
+        # --precompress build may have left some, so look next to every output once
+        import compress
+        for sibling_path in compress.remove_siblings(outputs, keep=outputs):
+            logger.debug("Removed stale output: %s", sibling_path)
+            removed += 1
 
-        if os.path.isfile(source_path):
-            try:
-                shutil.copy2(source_path, dest_path)
-                logger.info(f"Copied file: {source_path} -> {dest_path}")
-            except Exception as e:
-                logger.error(f"Failed to copy file {source_path}: {str(e)}")
+    links = {os.path.relpath(dest_path, PROJECT_ROOT): links for dest_path, links in index.items()}
+    manifest.save_manifest(manifest_path, new_outputs, links)
+    logger.info("Incremental build: %d copied, %d generated, %d removed, %d up to date",
+                copied, generated, removed, up_to_date)
 
-        elif os.path.isdir(source_path):
-            try:
-                if not os.path.exists(dest_path):
-                    os.makedirs(dest_path)
-                    logger.info(f"Created directory: {dest_path}")
-                copy_all_files_recursive(source_path, dest_path)
-            except Exception as e:
-                logger.error(f"Failed to process directory {source_path}: {str(e)}")
+
+def watch_site(port=8888, interval=0.25, link_mode="copy", cache=None, stop=None):
+    """
+    Builds the site once, serves public/ and rebuilds only what each edit affects.
+
+    A changed static file is recopied and a deleted source removes its output.
+    Every page that depends on a changed file according to the site graph (its
+    markdown, its template or an image it embeds) is regenerated, and nothing
+    else. Templates, the block cache and imports stay warm in this process, so
+    the cost of an edit does not grow with the size of the site.
+    """
+    import watch
+    incremental_build(link_mode=link_mode, cache=cache)
+    graph = site_graph()
+    server = watch.serve(PUBLIC_PATH, port=port)
+
+    on_change = partial(apply_changes, graph, link_mode=link_mode, cache=_open_render_cache(cache))
+
+    try:
+        watch.watch([CONTENT_PATH, STATIC_PATH, TEMPLATE_PATH], on_change, interval=interval, stop=stop)
+    finally:
+        server.shutdown()
+
+
+def _is_page_source(path):
+    return path.endswith(".md") and path.startswith(CONTENT_PATH + os.sep)
+
+
+def apply_changes(graph, changed, removed, link_mode="copy", cache=None):
+    """
+    Brings public/ up to date with the changed and removed source paths reported
+    by watch.watch, and graph with the site: see watch_site. cache is an open
+    render cache or None.
+    """
+    touched = changed | removed
+    for path in removed:
+        if path.startswith(STATIC_PATH + os.sep):
+            manifest.remove_output(os.path.join(PUBLIC_PATH, os.path.relpath(path, STATIC_PATH)), PUBLIC_PATH)
+    for path in changed:
+        if path.startswith(STATIC_PATH + os.sep):
+            assets.copy_file(path, os.path.join(PUBLIC_PATH, os.path.relpath(path, STATIC_PATH)), link_mode)
+    # Pages that depended on a removed or replaced template are looked up
+    # before the graph drops those edges
+    dirty = graph.affected(touched)
+    if any(os.path.basename(path) == templates.TEMPLATE_NAME for path in touched) or \
+            any(_is_page_source(path) and (path in removed or path not in graph.sources) for path in touched):
+        # Adding or removing pages or section templates changes the pages and the
+        # template each of them uses
+        for dest_path in graph.sync_pages(site_pages(), changed):
+            manifest.remove_output(dest_path, PUBLIC_PATH)
+    else:
+        # An edit can add or drop embedded images, so edited pages are re-read
+        for path in changed:
+            if path in graph.sources:
+                graph.add_page(graph.pages[graph.sources[path]])
+    dirty |= graph.affected(touched)
+    for batch in graph.schedule(dirty & graph.pages.keys()):
+        for dest_path in batch:
+            generate_page(*graph.pages[dest_path], cache=cache)
+
+
+def shard_build(shard_index, shard_count, shard_dir=SHARD_PATH, jobs=1, link_mode="copy", cache=None,
+                precompress=False, build_id=None):
+    """
+    Builds one shard of the site into shard_dir/shard-<index>/public/.
+
+    Pages and static files are assigned to shards by a stable hash of their path
+    (see shard.shard_of), so shard_count processes, on one machine or many, each
+    build a disjoint share of the site. merge_shards then assembles public/.
+    Links are checked at the merge, when every page they may point at is known.
+    build_id tags the shard's manifest with the run it belongs to.
+    """
+    import shard
+    root = shard.shard_root(shard_dir, shard_index)
+    dest_dir = os.path.join(root, "public")
+    os.makedirs(dest_dir, exist_ok=True)
+
+    def owned(rel_path):
+        return shard.shard_of(rel_path, shard_count) == shard_index
+
+    with profiling.stage("asset copy"):
+        synced = assets.sync_assets(STATIC_PATH, dest_dir, mode=link_mode, include=owned)
+    with profiling.stage("discover"):
+        all_pages = discover_pages(CONTENT_PATH, TEMPLATE_PATH, dest_dir)
+        pages = [page for page in all_pages if owned(os.path.relpath(page[0], CONTENT_PATH))]
+    index = generate_pages(pages, jobs=jobs, cache=cache)
+    keep = set(synced.outputs)
+    keep.update(dest_path for _, _, dest_path in pages)
+    if precompress:
+        # Compressing here spreads that work over the shards too
+        keep.update(precompress_outputs(keep).outputs)
+    assets.prune_extraneous(dest_dir, keep)
+    shard.save_shard_manifest(root, shard_index, shard_count,
+                              [os.path.relpath(path, dest_dir) for path in keep],
+                              {os.path.relpath(page, dest_dir): links for page, links in index.items()},
+                              build_id=build_id)
+    logger.info("Shard %d/%d: %d of %d pages, %d static files",
+                shard_index, shard_count, len(pages), len(all_pages), len(synced.outputs))
+
+
+def merge_shards(shard_dir=SHARD_PATH, link_mode="copy", build_id=None):
+    """
+    Assembles public/ from the shards built under shard_dir, once every shard has
+    finished. Each shard's outputs are synced in, skipping files public/ already
+    has unchanged, then the merged link index is checked and anything no shard
+    produced is pruned. With a build_id only the shards of that run are merged.
+    Raises ValueError when the shard set is incomplete.
+    """
+    import shard
+    manifests = shard.load_shard_manifests(shard_dir, build_id)
+    os.makedirs(PUBLIC_PATH, exist_ok=True)
+    keep = set()
+    index = {}
+    for manifest_data in manifests:
+        source_dir = os.path.join(shard.shard_root(shard_dir, manifest_data["index"]), "public")
+        # Only what the shard recorded is merged, never leftovers in its directory
+        with profiling.stage("asset copy"):
+            synced = assets.sync_assets(source_dir, PUBLIC_PATH, mode=link_mode,
+                                        include=set(manifest_data["outputs"]).__contains__)
+        keep.update(synced.outputs)
+        for page, links in manifest_data["links"].items():
+            index[os.path.join(PUBLIC_PATH, page)] = [(tag, url) for tag, url in links]
+    report_broken_links(index, keep)
+    removed = assets.prune_extraneous(PUBLIC_PATH, keep)
+    logger.info("Merged %d shards: %d outputs, %d stale outputs removed", len(manifests), len(keep), len(removed))
+    # Like a full build, the merge invalidates whatever an incremental build recorded
+    if os.path.exists(MANIFEST_PATH):
+        os.remove(MANIFEST_PATH)
+
+
+def copy_all_files_recursive(source_dir, dest_dir):
+    """Copies every file below source_dir into dest_dir, skipping unchanged ones"""
+    return assets.sync_assets(source_dir, dest_dir)
 
 
 def read_file_contents(filename):
-    with open(filename, "r") as f:
-        return f.read()
-
-
-def generate_page(from_path, template_path, dest_path):
-    logger.info(f"Generating page from {from_path} to {dest_path} using {template_path}")
-    markdown = read_file_contents(from_path)
-    template = read_file_contents(template_path)
-    html_string = ms.markdown_to_html_node(markdown).to_html()
-    title = ms.extract_title(markdown)
-    template = template.replace("{{ Title }}", title).replace("{{ Content }}", html_string)
-    pathdir = os.path.dirname(dest_path)
-    print(pathdir)
-    os.makedirs(pathdir, exist_ok=True)
-    with open(dest_path, "w") as f:
-        f.write(template)
+    return pageio.read_text(filename)
+
+
+def generate_page(from_path, template_path, dest_path, cache=None):
+    """
+    Renders one markdown page into dest_path and returns the ("a", href) and
+    ("img", src) targets of its links and images, collected while rendering.
+
+    With profiling on, every stage is timed where it runs and attributed to
+    from_path: reading and the template here, the per-block stages in
+    BlockStream and build_block_node, and writing in pageio.AtomicWriter.
+    """
+    logger.debug("Generating page from %s to %s using %s", from_path, dest_path, template_path)
+    with profiling.current_page(from_path):
+        return _generate_page(from_path, template_path, dest_path, cache)
+
+
+def _generate_page(from_path, template_path, dest_path, cache):
+    stage = profiling.stage
+    with stage("template"):
+        template = templates.load_template(template_path)
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    links = []
+    if cache is None:
+        # Render one block at a time, so memory use is bounded by the largest block
+        # (or, for a small page, the page) rather than by the whole output
+        with ExitStack() as stack:
+            with stage("read"):
+                src = stack.enter_context(pageio.open_source(from_path))
+            blocks = ms.iter_markdown_blocks(src)
+            with stage("block-split"):
+                first_block = next(blocks, "")
+            title = ms.title_from_block(first_block)
+            content = ms.BlockStream(itertools.chain([first_block], blocks), links)
+            if sum(name == "Content" for name, _ in template.slots) > 1:
+                # A stream renders once; a template using the content twice gets a string
+                content = content.to_html()
+            with pageio.AtomicWriter(dest_path) as out:
+                # Literals, title and content fragments are batched into large writes
+                template.render_into(out.write, {"Title": title, "Content": content})
+        return links
+
+    with stage("read"):
+        markdown = read_file_contents(from_path)
+    cached = cache.get(markdown)
+    if cached is not None:
+        title, content, links = cached
+    else:
+        # The same blocks and stages as the streaming path, rendered to a string
+        content = ms.BlockStream(ms.iter_markdown_blocks(markdown), links).to_html()
+        title = ms.extract_title(markdown)
+        cache.put(markdown, title, content, links)
+    with pageio.AtomicWriter(dest_path) as out:
+        template.render_into(out.write, {"Title": title, "Content": content})
+    return links
+
+
+def job_count(value):
+    """argparse type for --jobs: a worker count, 0 meaning every core."""
+    import argparse
+    try:
+        jobs = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid job count {value!r}, expected an integer")
+    if jobs < 0:
+        raise argparse.ArgumentTypeError(f"invalid job count {jobs}, expected 0 (every core) or more")
+    return jobs
+
+
+def _shard_spec(spec):
+    import shard
+    import argparse
+    try:
+        return shard.parse_shard(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def build_parser():
+    import argparse
+    parser = argparse.ArgumentParser(description="Build the static site into public/")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only rebuild outputs whose inputs changed since the last build")
+    parser.add_argument("--jobs", "-j", type=job_count, default=1, metavar="N",
+                        help="render pages on N worker processes (0 uses every core)")
+    parser.add_argument("--link-mode", choices=assets.LINK_MODES, default="copy",
+                        help="how static files are placed in public/")
+    parser.add_argument("--render-cache", action="store_true",
+                        help=f"reuse rendered markdown stored in {os.path.relpath(RENDER_CACHE_PATH, PROJECT_ROOT)}/")
+    parser.add_argument("--render-cache-size", type=int, default=256, metavar="MB",
+                        help="evict least recently used cache entries beyond this size")
+    parser.add_argument("--precompress", action="store_true",
+                        help="write .gz (and .br, if brotli is installed) siblings of compressible outputs")
+    parser.add_argument("--shard", type=_shard_spec, metavar="I/N",
+                        help="build only shard I of N (0-based) into --shard-dir, for --merge-shards to combine")
+    parser.add_argument("--shard-dir", default=SHARD_PATH, metavar="DIR",
+                        help="where --shard writes and --merge-shards reads the shard builds")
+    parser.add_argument("--merge-shards", action="store_true",
+                        help="assemble public/ from the finished shard builds in --shard-dir")
+    parser.add_argument("--build-id", metavar="ID",
+                        help="tag --shard builds with ID, and have --merge-shards merge only the shards tagged ID")
+    parser.add_argument("--watch", action="store_true",
+                        help="serve public/ and rebuild changed pages until interrupted")
+    parser.add_argument("--port", type=int, default=8888, help="port used by --watch")
+    parser.add_argument("--verbose", "-v", action="store_true",
+                        help="log every copied file and generated page")
+    parser.add_argument("--profile", action="store_true",
+                        help="time every build stage and write a trace-event file")
+    parser.add_argument("--profile-output", default=PROFILE_PATH, metavar="JSON",
+                        help="where --profile writes the trace (open it in Perfetto or speedscope)")
+    return parser
+
+
+def parse_args(argv=None):
+    return build_parser().parse_args(argv)
+
+
+def start_logging(log_dir=LOG_DIR, suffix=""):
+    """
+    Creates a timestamped log file in log_dir and routes all logging to it and
+    to the console. suffix keeps apart the files of processes started in the same
+    second, such as the shards of one build. Returns the running BuildLog and the
+    log file's path.
+    """
+    import logs
+    from datetime import datetime
+    os.makedirs(log_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    log_filepath = os.path.join(log_dir, f"file_operations_{timestamp}{suffix}.log")
+    # Log through a queue drained by a background thread, written to file and console in batches
+    return logs.configure_logging(log_filepath), log_filepath
+
+
+def cli(argv=None):
+    """The command line entry point: sets up logging, then builds or watches the site."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    build_log, log_filepath = start_logging(suffix=f"_shard-{args.shard[0]}" if args.shard else "")
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+    try:
+        logger.info("=== Starting File Copy Operation ===")
+        cache = (RENDER_CACHE_PATH, args.render_cache_size * 1024 * 1024) if args.render_cache else None
+        if args.watch:
+            try:
+                watch_site(port=args.port, link_mode=args.link_mode, cache=cache)
+            except KeyboardInterrupt:
+                pass
+        else:
+            if args.profile:
+                profiling.enable()
+            if args.merge_shards:
+                try:
+                    merge_shards(args.shard_dir, link_mode=args.link_mode, build_id=args.build_id)
+                except ValueError as e:
+                    # An incomplete or mixed shard set is a usage problem, not a crash
+                    parser.error(str(e))
+            elif args.shard:
+                shard_build(*args.shard, shard_dir=args.shard_dir, jobs=args.jobs or None, link_mode=args.link_mode,
+                            cache=cache, precompress=args.precompress, build_id=args.build_id)
+            else:
+                main(incremental=args.incremental, jobs=args.jobs or None, link_mode=args.link_mode, cache=cache,
+                     precompress=args.precompress)
+            if args.profile:
+                events = profiling.disable()
+                print(profiling.summary_table(events))
+                profiling.write_trace(events, args.profile_output)
+                print(f"Profile trace written: {args.profile_output}")
+        logger.info("=== File Copy Operation Completed ===")
+    finally:
+        # Write out whatever is still queued, even when the build failed
+        build_log.stop()
+    print(f"Log file created: {log_filepath}")
+
 
 if __name__ == "__main__":
-    logger.info("=== Starting File Copy Operation ===")
-    main()
-    logger.info("=== File Copy Operation Completed ===")
-    print(f"Log file created: {log_filepath}")
\ No newline at end of file
+    cli()
@@ -0,0 +1,103 @@
+import os
+import json
+import hashlib
+import pageio
+
+MANIFEST_VERSION = 3
+
+
+def file_digest(path):
+    """
+    Returns the hex sha256 digest of a file's contents.
+    """
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def file_signature(path):
+    """
+    Returns a cheap "size:mtime" signature for files too large to hash on every
+    build, such as images, or None when the file does not exist.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def load_manifest(path):
+    """
+    Loads the build manifest stored at path.
+
+    The manifest maps every output file (relative to the project root) to the
+    input files it was built from and their content hashes:
+
+        {"public/index.html": {"content/index.md": "ab12...", "template.html": "cd34..."}}
+
+    Args:
+        path (str): Location of the manifest file.
+
+    Returns:
+        dict: The recorded outputs, or an empty dict when the manifest is missing,
+        unreadable or was written by a different manifest version.
+    """
+    return _load(path).get("outputs", {})
+
+
+def load_links(path):
+    """
+    Loads the link index stored with the manifest, {page output: [(tag, url), ...]},
+    so pages an incremental build skips keep their links in the link check.
+    """
+    return {output: [(tag, url) for tag, url in links] for output, links in _load(path).get("links", {}).items()}
+
+
+def _load(path):
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        return {}
+    return data
+
+
+def save_manifest(path, outputs, links=None):
+    """
+    Writes the manifest, and optionally the link index, atomically, so an
+    interrupted build never leaves a truncated manifest behind.
+    """
+    data = {"version": MANIFEST_VERSION, "outputs": outputs}
+    if links is not None:
+        data["links"] = links
+    with pageio.atomic_file(path) as f:
+        # No indent: only compact output takes json's C encoder, and the link index
+        # makes the manifest large
+        json.dump(data, f, separators=(",", ":"), sort_keys=True)
+
+
+def needs_rebuild(old_outputs, output, inputs, dest_path):
+    """
+    An output is rebuilt when it is missing on disk or any of its input hashes
+    differ from the ones recorded in the previous manifest.
+    """
+    return old_outputs.get(output) != inputs or not os.path.exists(dest_path)
+
+
+def remove_output(dest_path, stop_dir):
+    """
+    Removes a stale output file and prunes the directories it leaves empty,
+    never going above stop_dir.
+    """
+    if os.path.exists(dest_path):
+        os.remove(dest_path)
+    parent = os.path.dirname(dest_path)
+    stop_dir = os.path.abspath(stop_dir)
+    while os.path.abspath(parent).startswith(stop_dir + os.sep):
+        try:
+            os.rmdir(parent)
+        except OSError:
+            break
+        parent = os.path.dirname(parent)
@@ -1,8 +1,10 @@
 import re
+from functools import lru_cache
 from typing import List
 from enum import Enum
 from textnode import TextNode, TextType, text_node_to_html_node
-from htmlnode import ParentNode, LeafNode
+from htmlnode import ParentNode, LeafNode, CodeNode
+import profiling
 
 class BlockType(Enum):
     PARAGRAPH = "paragraph"
@@ -107,7 +109,7 @@ def split_nodes_link(old_nodes):
     )
 
 
-def text_to_textnodes(text) -> List[TextNode]:
+def text_to_textnodes_chained(text) -> List[TextNode]:
     initial_node = TextNode(text, TextType.TEXT)
     # Split code segments
     code_nodes = split_nodes_delimiter([initial_node], "`", TextType.CODE)
@@ -122,6 +124,189 @@ def text_to_textnodes(text) -> List[TextNode]:
     return nodes
 
 
+# Every character that can open a code span, bold or italic; a plain character
+# class keeps the scan for the next candidate fast
+_DELIMITER_START = re.compile(r"[`*_]")
+# Same shapes as extract_markdown_images/links, but refusing to span a delimiter,
+# because the chained splitters cut delimiters out before looking for images and links
+_NO_DELIMITER = r"[^\[\]`_*]*(?:\*(?!\*)[^\[\]`_*]*)*"
+_NO_DELIMITER_URL = r"[^\(\)`_*]*(?:\*(?!\*)[^\(\)`_*]*)*"
+_INLINE_IMAGE = re.compile(rf"!\[({_NO_DELIMITER})\]\(({_NO_DELIMITER_URL})\)")
+
+
+def _image_or_link(label, url):
+    # An image (groups 1-2) or a link not preceded by ! (groups 3-4) in one
+    # alternation. The ! check comes after the [, so both branches start with a
+    # literal character the regex engine can scan for.
+    return re.compile(rf"!\[({label})\]\(({url})\)|\[(?<!!\[)({label})\]\(({url})\)")
+
+
+_IMAGE_OR_LINK = _image_or_link(_NO_DELIMITER, _NO_DELIMITER_URL)
+# The same for text without any *, which is nearly all of it: without the single *
+# branch every quantifier can be possessive, which the regex engine runs faster
+_IMAGE_OR_LINK_NO_STAR = _image_or_link(r"[^\[\]`_*]*+", r"[^\(\)`_*]*+")
+
+
+def _hides_image(text, start, end):
+    # The chained splitters extract images before links, so a link whose url
+    # contains the start of a valid image loses to that image
+    bang = text.find("![", start, end)
+    while bang >= 0:
+        if _INLINE_IMAGE.match(text, bang):
+            return True
+        bang = text.find("![", bang + 1, end)
+    return False
+
+
+def _split_images_and_links(text, text_start, end, nodes):
+    """
+    Appends the text, image and link nodes of text[text_start:end], a stretch
+    without code, bold or italic, to nodes, except for its trailing plain text.
+    Returns where that trailing text starts.
+
+    A single regex split finds every image and link of the stretch, so they cost
+    no Python-level search per element.
+    """
+    # A stretch starts where the text or a previous element does, never right
+    # after a !, so slicing it off hides nothing from the link branch's lookbehind
+    stretch = text[text_start:end]
+    pattern = _IMAGE_OR_LINK if "*" in stretch else _IMAGE_OR_LINK_NO_STAR
+    # [before, alt, src, label, url, after, alt, src, ...]
+    parts = iter(pattern.split(stretch))
+    before = next(parts)
+    mark = len(nodes)
+    append = nodes.append
+    text_type, image_type, link_type = TextType.TEXT, TextType.IMAGE, TextType.LINK
+    for alt, src, label, url, after in zip(parts, parts, parts, parts, parts):
+        if label is None:
+            node = TextNode(alt, image_type, src)
+        elif "![" in url:
+            # Deciding whether an image hides this link needs positions, which
+            # the rare stretches with such a url are rescanned for
+            del nodes[mark:]
+            return _split_with_hidden_images(text, text_start, end, append)
+        else:
+            node = TextNode(label, link_type, url)
+        if before:
+            append(TextNode(before, text_type))
+        append(node)
+        before = after
+    return end - len(before)
+
+
+def _split_with_hidden_images(text, text_start, end, append):
+    # _split_images_and_links, tracking where each element starts
+    scan = text_start
+    while True:
+        parts = iter(_IMAGE_OR_LINK.split(text[scan:end]))
+        position = scan + len(next(parts))
+        for alt, src, label, url, after in zip(parts, parts, parts, parts, parts):
+            if label is None:
+                length = len(alt) + len(src) + 5
+                node = TextNode(alt, TextType.IMAGE, src)
+            else:
+                length = len(label) + len(url) + 4
+                if "![" in url and _hides_image(text, position, position + length):
+                    # Not a link after all: look again from just after its [
+                    scan = position + 1
+                    break
+                node = TextNode(label, TextType.LINK, url)
+            if position > text_start:
+                append(TextNode(text[text_start:position], TextType.TEXT))
+            append(node)
+            text_start = position + length
+            position = text_start + len(after)
+        else:
+            return text_start
+
+
+def text_to_textnodes_single_pass(text) -> List[TextNode]:
+    """
+    Tokenizes inline markdown in one left-to-right scan.
+
+    Produces exactly the same TextNode sequence as text_to_textnodes_chained,
+    including its precedence (code, then bold, then italic, then images and links)
+    and its "invalid Markdown syntax" errors, without building an intermediate
+    node list per splitter.
+
+    The scan stops at code, bold and italic delimiters. Images and links cannot
+    contain one, so the stretch before each delimiter is split into images and
+    links in one regex call.
+
+    Args:
+        text (str): The inline markdown to tokenize.
+
+    Returns:
+        List[TextNode]: The resulting text, code, bold, italic, image and link nodes.
+    """
+    nodes = []
+    text_start = 0  # start of the pending plain text run
+    pos = 0
+    end_of_text = len(text)
+    search = _DELIMITER_START.search
+    append = nodes.append
+    while True:
+        match = search(text, pos)
+        if match is None:
+            break
+        start = match.start()
+        char = text[start]
+        if char == "`":
+            close = text.find("`", start + 1)
+            if close < 0:
+                raise Exception("invalid Markdown syntax")
+            inner, node_type, pos = text[start + 1:close], TextType.CODE, close + 1
+        elif char == "*":
+            if not text.startswith("*", start + 1):
+                pos = start + 1
+                continue
+            # The closing ** must come before any code span starts
+            close = text.find("**", start + 2)
+            if close < 0 or text.find("`", start + 2, close) >= 0:
+                raise Exception("invalid Markdown syntax")
+            inner, node_type, pos = text[start + 2:close], TextType.BOLD, close + 2
+        else:
+            # The closing _ must come before any code span or bold starts
+            close = text.find("_", start + 1)
+            if close < 0 or text.find("`", start + 1, close) >= 0 or text.find("**", start + 1, close) >= 0:
+                raise Exception("invalid Markdown syntax")
+            inner, node_type, pos = text[start + 1:close], TextType.ITALIC, close + 1
+        if text.find("](", text_start, start) >= 0:
+            text_start = _split_images_and_links(text, text_start, start, nodes)
+        if start > text_start:
+            append(TextNode(text[text_start:start], TextType.TEXT))
+        if inner:
+            append(TextNode(inner, node_type))
+        text_start = pos
+    if text.find("](", text_start) >= 0:
+        text_start = _split_images_and_links(text, text_start, end_of_text, nodes)
+    if text_start < end_of_text:
+        append(TextNode(text[text_start:], TextType.TEXT))
+    return nodes
+
+
+INLINE_TOKENIZERS = {
+    "chained": text_to_textnodes_chained,
+    "single_pass": text_to_textnodes_single_pass,
+}
+# Tokenizer used by text_to_textnodes; switch with set_inline_tokenizer
+_inline_tokenizer = text_to_textnodes_single_pass
+
+
+def set_inline_tokenizer(name):
+    """Selects the inline tokenizer by name: "single_pass" (default) or "chained"."""
+    global _inline_tokenizer
+    if name not in INLINE_TOKENIZERS:
+        raise ValueError(f"unknown inline tokenizer: {name}")
+    _inline_tokenizer = INLINE_TOKENIZERS[name]
+    # Cached block nodes were built by the previous tokenizer
+    clear_block_cache()
+
+
+def text_to_textnodes(text) -> List[TextNode]:
+    return _inline_tokenizer(text)
+
+
 def markdown_to_blocks(markdown):
     """
     Splits a markdown string into a list of non-empty blocks.
@@ -135,9 +320,82 @@ def markdown_to_blocks(markdown):
     Returns:
         list[str]: A list of non-empty, stripped markdown blocks.
     """
-    all_blocks = markdown.split('\n\n')
-    clean_blocks = [stripped for block in all_blocks if (stripped := block.strip())]
-    return clean_blocks
+    return list(iter_markdown_blocks(markdown))
+
+
+BLOCK_READ_SIZE = 64 * 1024
+
+
+def iter_markdown_blocks(source, chunk_size=BLOCK_READ_SIZE):
+    """
+    Lazily yields the same stripped, non-empty blocks as markdown_to_blocks.
+
+    Args:
+        source: A markdown string, a file object opened in text or binary mode, or a
+            bytes-like object such as an mmap.mmap of the file. Bytes are decoded as
+            UTF-8 one block at a time.
+        chunk_size (int): How much to read from a file object at a time.
+
+    Yields:
+        str: One stripped block at a time, so memory is bounded by the largest block
+        rather than by the whole document.
+    """
+    if isinstance(source, str):
+        yield from _iter_buffer_blocks(source, "\n\n", None)
+    elif hasattr(source, "read"):
+        yield from _iter_file_blocks(source, chunk_size)
+    else:
+        yield from _iter_buffer_blocks(source, b"\n\n", "utf-8")
+
+
+def _iter_buffer_blocks(buffer, separator, encoding):
+    # Same cut points as buffer.split(separator), without building the list
+    start = 0
+    while True:
+        end = buffer.find(separator, start)
+        block = buffer[start:] if end < 0 else buffer[start:end]
+        if encoding is not None:
+            block = block.decode(encoding)
+        if stripped := block.strip():
+            yield stripped
+        if end < 0:
+            return
+        start = end + len(separator)
+
+
+def _iter_file_blocks(f, chunk_size):
+    # Only the current block is kept, as a list of chunk pieces joined once the
+    # block is complete, so a huge block is not re-copied on every read
+    parts = []
+    first = f.read(chunk_size)
+    empty = first[:0]
+    newline = "\n" if isinstance(first, str) else b"\n"
+    separator = newline * 2
+    chunk = first
+    while chunk:
+        if parts and parts[-1].endswith(newline):
+            # A separator may straddle two reads
+            parts[-1] = parts[-1][:-1]
+            chunk = newline + chunk
+        pieces = chunk.split(separator)
+        parts.append(pieces[0])
+        for piece in pieces[1:]:
+            if stripped := _decode_block(empty.join(parts)):
+                yield stripped
+            parts = [piece]
+        chunk = f.read(chunk_size)
+    if stripped := _decode_block(empty.join(parts)):
+        yield stripped
+
+
+def _decode_block(block):
+    if isinstance(block, bytes):
+        block = block.decode("utf-8")
+    return block.strip()
+
+
+_HEADING_BLOCK = re.compile(r"#{1,6}\s.*$")
+_CODE_BLOCK = re.compile(r"```.*```$", re.DOTALL)
 
 
 def block_to_block_type(block):
@@ -151,40 +409,41 @@ def block_to_block_type(block):
     Returns:
         BlockType: The type of the block, as defined by the BlockType enum.
     """
-    heading = r'^#{1,6}\s.*$'
-    code_block = r'^```.*```$'
-
-    # Check for heading (single line)
-    if re.match(heading, block):
+    first = block[:1]
+    # Headings and code fences are decided by their first character
+    if first == "#" and _HEADING_BLOCK.match(block):
         return BlockType.HEADING
-    
-    # Check for code block (single line fenced)
-    if re.match(code_block, block, re.DOTALL):
+    if first == "`" and _CODE_BLOCK.match(block):
         return BlockType.CODE
-    
-    # For multi-line blocks, check each line
-    lines = block.split('\n')
-    if not lines:
-        return BlockType.PARAGRAPH
-    
-    # Check for quote (all non-empty lines must start with >)
-    if all(line.startswith('>') for line in lines if line.strip()):
+
+    # Quote: every non-blank line starts with >. Unordered list: every non-blank
+    # line starts with -. Ordered list: every line starts with "1. ", "2. ", ...
+    # A non-blank first character already rules out two of the three.
+    if first.isspace() or not first:
+        quote = unordered = True
+    else:
+        quote, unordered = first == ">", first == "-"
+    ordered = first == "1"
+    number = 1
+    for line in block.split("\n"):
+        if ordered:
+            if line.startswith(f"{number}. "):
+                number += 1
+            else:
+                ordered = False
+        if (quote or unordered) and line and not line.isspace():
+            if quote and line[0] != ">":
+                quote = False
+            if unordered and line[0] != "-":
+                unordered = False
+        if not (quote or unordered or ordered):
+            return BlockType.PARAGRAPH
+
+    if quote:
         return BlockType.QUOTE
-    
-    # Check for unordered list (all non-empty lines must start with -)
-    if all(line.startswith('-') for line in lines if line.strip()):
+    if unordered:
         return BlockType.UNORDERED_LIST
-    # Check for ordered list (all non-empty lines must start with a number followed by .)
-    
-    list_numbering = 1
-    ordered_list = True
-    for line in lines:
-        if not line.startswith(str(list_numbering)+". "):
-            ordered_list = False
-            break
-        list_numbering += 1
-    
-    return BlockType.ORDERED_LIST if ordered_list else BlockType.PARAGRAPH
+    return BlockType.ORDERED_LIST
 
 
 def markdown_to_html_node(markdown):
@@ -199,29 +458,119 @@ def markdown_to_html_node(markdown):
 
     The function splits the input markdown into blocks, determines the type of each block,
     and appends the corresponding HTML node (code, paragraph, heading, quote, unordered list, or ordered list)
-    as a child to the root "div" node.
+    as a child to the root "div" node. Repeated blocks are served from the block cache.
     """
     parent_node = ParentNode("div", [])
     blocks = markdown_to_blocks(markdown)
     for block in blocks:
-        # print(block)
-        block_type = block_to_block_type(block)
-        if block_type == BlockType.CODE:
-            parent_node.children.append(block_to_code_node(block))
-        if block_type == BlockType.PARAGRAPH:
-            parent_node.children.append(block_to_paragraph_node(block))
-        if block_type == BlockType.HEADING:
-            parent_node.children.append(block_to_heading_node(block))
-        if block_type == BlockType.QUOTE:
-            parent_node.children.append(block_to_quote_node(block))
-        if block_type == BlockType.UNORDERED_LIST:
-            parent_node.children.append(block_to_unordered_list_node(block))
-        if block_type == BlockType.ORDERED_LIST:
-            parent_node.children.append(block_to_ordered_list_node(block))      
-
+        parent_node.children.append(block_to_html_node(block))
     return parent_node
 
 
+class BlockStream():
+    """
+    Renders a stream of blocks as the same <div> markdown_to_html_node produces,
+    building and writing one block node at a time.
+
+    Takes any iterable of blocks, typically iter_markdown_blocks over an open file,
+    and can be used wherever an HTMLNode's render_into is expected. When links is
+    a list, the targets of the links and images are collected into it while the
+    blocks are rendered (see collect_links). While profiling is on, splitting and
+    rendering the blocks are timed as stages; build_block_node times the rest.
+    """
+    __slots__ = ("blocks", "links")
+
+    def __init__(self, blocks, links=None):
+        self.blocks = blocks
+        self.links = links
+
+    def render_into(self, write):
+        blocks, render = self.blocks, _render_block
+        if profiling.enabled():
+            blocks = profiling.timed_iter("block-split", blocks)
+            render = profiling.timed("render", render)
+        write("<div>")
+        empty = True
+        links = self.links
+        for block in blocks:
+            render(block_to_html_node(block), write, links)
+            empty = False
+        if empty:
+            raise Exception(ValueError, "missing children value")
+        write("</div>")
+
+    def to_html(self):
+        parts = []
+        self.render_into(parts.append)
+        return "".join(parts)
+
+
+def _render_block(node, write, links):
+    node.render_into(write)
+    if links is not None:
+        collect_links(node, links)
+
+
+def collect_links(node, links):
+    """
+    Appends ("a", href) for every link and ("img", src) for every image below node
+    to links, reusing the targets the inline parser already extracted.
+    """
+    children = node.children
+    if children is None:
+        if node.tag == "a":
+            links.append(("a", node.props["href"]))
+        elif node.tag == "img":
+            links.append(("img", node.props["src"]))
+        return
+    for child in children:
+        collect_links(child, links)
+
+
+def build_block_node(block):
+    """
+    Classifies a single block and builds its HTML node, without caching. While
+    profiling is on, both steps are timed, so only block cache misses show up
+    in the classify and inline-parse stages.
+    """
+    if profiling.enabled():
+        with profiling.stage("classify"):
+            block_type = block_to_block_type(block)
+        with profiling.stage("inline-parse"):
+            return BLOCK_BUILDERS[block_type](block)
+    block_type = block_to_block_type(block)
+    return BLOCK_BUILDERS[block_type](block)
+
+
+# Blocks are usually small and repeated ones (disclaimers, shared snippets) recur
+# across pages; anything longer than this is rendered without taking a cache slot
+BLOCK_CACHE_SIZE = 4096
+BLOCK_CACHE_MAX_LENGTH = 16 * 1024
+
+# The cached nodes are shared between every document containing the block, which
+# is safe because nothing mutates a block node once it is built
+_cached_block_node = lru_cache(maxsize=BLOCK_CACHE_SIZE)(build_block_node)
+
+
+def block_to_html_node(block):
+    """
+    Returns the HTML node for a block, reusing the node built for an identical
+    block earlier in this process when there is one.
+    """
+    if len(block) > BLOCK_CACHE_MAX_LENGTH:
+        return build_block_node(block)
+    return _cached_block_node(block)
+
+
+def block_cache_info():
+    """Hit/miss counters and current size of the block cache."""
+    return _cached_block_node.cache_info()
+
+
+def clear_block_cache():
+    _cached_block_node.cache_clear()
+
+
 def text_to_children(text: str) -> List[LeafNode]:
     out_nodes = []
     list_of_nodes = text_to_textnodes(text)
@@ -244,9 +593,16 @@ def block_to_heading_node(text):
 
 
 def block_to_code_node(text):
-    leaf = LeafNode("code", text)
-    parent = ParentNode("pre", [leaf])
-    return parent
+    """
+    Builds <pre><code> for a fenced block. The fences are dropped, along with the
+    info string on the opening line (```python), and the code is kept as a span
+    of the block, escaped only when it is rendered.
+    """
+    end = len(text) - 3
+    start = text.find("\n", 3, end)
+    # A one-line block such as ```print()``` has no opening line to skip
+    start = 3 if start < 0 else start + 1
+    return ParentNode("pre", [CodeNode(text, start, end)])
 
 
 def block_to_quote_node(text):
@@ -277,8 +633,22 @@ def block_to_ordered_list_node(text):
     return parent
 
 
+BLOCK_BUILDERS = {
+    BlockType.CODE: block_to_code_node,
+    BlockType.PARAGRAPH: block_to_paragraph_node,
+    BlockType.HEADING: block_to_heading_node,
+    BlockType.QUOTE: block_to_quote_node,
+    BlockType.UNORDERED_LIST: block_to_unordered_list_node,
+    BlockType.ORDERED_LIST: block_to_ordered_list_node,
+}
+
+
 def extract_title(markdown):
-    blocks = markdown_to_blocks(markdown)
-    if blocks[0].startswith("# "):
-        return blocks[0].lstrip("# ").strip()
+    return title_from_block(next(iter_markdown_blocks(markdown), ""))
+
+
+def title_from_block(block):
+    """Returns the title held by a document's first block."""
+    if block.startswith("# "):
+        return block.lstrip("# ").strip()
     raise Exception("Header not found")
@@ -0,0 +1,180 @@
+import os
+import mmap
+import itertools
+from contextlib import contextmanager
+import profiling
+
+# Inputs at least this large are memory-mapped instead of read into a bytes copy
+MMAP_THRESHOLD = 1024 * 1024
+# Output is encoded and handed to the OS in chunks of about this many bytes
+WRITE_BUFFER_SIZE = 256 * 1024
+
+_temp_ids = itertools.count()
+
+
+def _normalize_newlines(text):
+    # What text mode's universal newlines did, so blocks split the same way
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def read_text(path, threshold=MMAP_THRESHOLD, digest=None):
+    """
+    Returns the UTF-8 text of the file at path, with newlines normalized like a
+    text-mode read. Files of at least threshold bytes are memory-mapped and
+    decoded straight from the mapping, so the bytes are never copied first.
+
+    digest is an optional hashlib object that is fed the file's raw bytes, so a
+    caller needing both the text and the hash reads the file once.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < threshold or size == 0:
+            data = f.read()
+            if digest is not None:
+                digest.update(data)
+            return _normalize_newlines(data.decode("utf-8"))
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+            if digest is not None:
+                digest.update(view)
+            text = str(view, "utf-8")
+    return _normalize_newlines(text)
+
+
+@contextmanager
+def open_source(path, threshold=MMAP_THRESHOLD):
+    """
+    Opens a markdown file for markdown_split.iter_markdown_blocks.
+
+    Yields a read-only mmap of files of at least threshold bytes, so a large page
+    is decoded one block at a time straight from the page cache, and the decoded
+    text of smaller files, which one read and one decode handle faster. A large
+    file with \\r line endings is decoded whole instead, as blocks are only split
+    on \\n\\n.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < threshold or size == 0:
+            yield _normalize_newlines(f.read().decode("utf-8"))
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if mapped.find(b"\r") >= 0:
+                with memoryview(mapped) as view:
+                    yield _normalize_newlines(str(view, "utf-8"))
+            else:
+                yield mapped
+
+
+def temp_path(path):
+    """
+    A temporary name next to path that no other writer uses at the same time,
+    whether another process (say the render daemon and a CLI build) or another
+    thread of this one.
+    """
+    return f"{path}.{os.getpid()}.{next(_temp_ids)}.tmp"
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+@contextmanager
+def atomic_file(path, mode="w"):
+    """
+    Opens a temporary file next to path for writing, in mode "w" or "wb", and
+    renames it over path once the block exits cleanly:
+
+        with atomic_file(manifest_path) as f:
+            json.dump(data, f)
+
+    Readers see the old file or the complete new one. On an exception the
+    temporary file is removed and path is left untouched.
+    """
+    tmp_path = temp_path(path)
+    try:
+        with open(tmp_path, mode) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        _remove_quietly(tmp_path)
+        raise
+
+
+class AtomicWriter():
+    """
+    Writes a UTF-8 text file that appears all at once:
+
+        with AtomicWriter(dest_path) as out:
+            template.render_into(out.write, values)
+
+    write() only collects str fragments. About every buffer_size of them are
+    joined and encoded in one go and written to a temporary file next to path
+    through a binary handle, so many small fragments cost one encode and one
+    write call. On a clean exit the temporary file is renamed over path, so
+    readers see either the old file or the complete new one, never a partial
+    page. On an exception it is removed and path is left untouched.
+
+    While profiling is on, every flush and the final commit are timed as the
+    write stage; collecting fragments is left to the stage producing them.
+    """
+    def __init__(self, path, buffer_size=WRITE_BUFFER_SIZE):
+        self.path = path
+        self.tmp_path = temp_path(path)
+        self.buffer_size = buffer_size
+        self._parts = []
+        self._pending = 0
+        self._file = open(self.tmp_path, "wb", buffering=buffer_size)
+
+    def write(self, text):
+        self._parts.append(text)
+        self._pending += len(text)
+        if self._pending >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        with profiling.stage("write"):
+            self._write_parts()
+
+    def _write_parts(self):
+        if self._parts:
+            self._file.write("".join(self._parts).encode("utf-8"))
+            self._parts.clear()
+            self._pending = 0
+
+    def commit(self):
+        """Writes out what is buffered and moves the file into place."""
+        with profiling.stage("write"):
+            try:
+                self._write_parts()
+            finally:
+                self._file.close()
+            os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        """Drops everything written; path keeps its previous content, if any."""
+        self._parts.clear()
+        self._file.close()
+        _remove_quietly(self.tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            try:
+                self.commit()
+            except BaseException:
+                self.abort()
+                raise
+        else:
+            self.abort()
+
+
+def write_text(path, text):
+    """Atomically replaces the file at path with text, see AtomicWriter."""
+    with AtomicWriter(path) as out:
+        out.write(text)
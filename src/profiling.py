@@ -0,0 +1,211 @@
+import os
+import sys
+import json
+import time
+from contextlib import contextmanager
+
+STAGES = ("discover", "read", "block-split", "classify", "inline-parse",
+          "render", "template", "write", "asset copy", "link check", "compress")
+
+_active = None
+
+
+class Profiler():
+    """
+    Records one event per timed stage: (stage, page, start_ns, duration_ns,
+    allocated_blocks, pid). allocated_blocks is the change in
+    sys.getallocatedblocks() across the stage, i.e. the objects it left alive.
+    Stages that name no page are attributed to the current page, if any.
+    """
+    def __init__(self):
+        self.events = []
+        self.page = None
+
+    def stage(self, name, page=None):
+        return _Stage(self.events, name, self.page if page is None else page)
+
+
+class _Stage():
+    __slots__ = ("events", "name", "page", "start", "blocks")
+
+    def __init__(self, events, name, page):
+        self.events = events
+        self.name = name
+        self.page = page
+
+    def __enter__(self):
+        self.blocks = sys.getallocatedblocks()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        duration = time.perf_counter_ns() - self.start
+        self.events.append((self.name, self.page, self.start, duration,
+                            sys.getallocatedblocks() - self.blocks, os.getpid()))
+        return False
+
+
+class _NullStage():
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name, page=None):
+    """
+    Times a build stage on the active profiler:
+
+        with profiling.stage("read", page):
+            ...
+
+    When profiling is off this returns a shared no-op context manager, so the
+    instrumentation costs one global lookup per stage.
+    """
+    if _active is None:
+        return _NULL_STAGE
+    return _active.stage(name, page)
+
+
+@contextmanager
+def current_page(page):
+    """
+    Attributes the stages timed inside the block to page, so code that knows
+    nothing of pages, such as a block builder or a file writer, can time its own
+    stages:
+
+        with profiling.current_page(from_path):
+            ...
+    """
+    profiler = _active
+    if profiler is None:
+        yield
+        return
+    previous, profiler.page = profiler.page, page
+    try:
+        yield
+    finally:
+        profiler.page = previous
+
+
+def timed(name, fn):
+    """
+    Returns fn wrapped so every call is timed as a stage. Hot loops wrap their
+    steps once when profiling is on and call them unwrapped otherwise, instead
+    of entering a stage per iteration.
+    """
+    profiler = _active
+
+    def timed_fn(*args):
+        with profiler.stage(name):
+            return fn(*args)
+    return timed_fn
+
+
+def timed_iter(name, iterable):
+    """Yields the items of iterable, timing the production of each as a stage."""
+    profiler = _active
+    iterator = iter(iterable)
+    while True:
+        with profiler.stage(name):
+            item = next(iterator, _END)
+        if item is _END:
+            return
+        yield item
+
+
+_END = object()
+
+
+def enabled():
+    return _active is not None
+
+
+def enable():
+    global _active
+    _active = Profiler()
+    return _active
+
+
+def disable():
+    """Stops profiling and returns the events recorded so far."""
+    global _active
+    events = _active.events if _active is not None else []
+    _active = None
+    return events
+
+
+def add_events(events):
+    """Merges events recorded in another process into the active profiler."""
+    if _active is not None:
+        _active.events.extend(events)
+
+
+def aggregate(events):
+    """Returns {stage: (count, total_ns, allocated_blocks)} in pipeline order."""
+    totals = {}
+    for name, _, _, duration, blocks, _ in events:
+        count, total, allocated = totals.get(name, (0, 0, 0))
+        totals[name] = (count + 1, total + duration, allocated + blocks)
+    order = {name: i for i, name in enumerate(STAGES)}
+    return dict(sorted(totals.items(), key=lambda item: order.get(item[0], len(order))))
+
+
+def per_page(events):
+    """Returns {page: {stage: duration_ns}} for the events tied to a page."""
+    pages = {}
+    for name, page, _, duration, _, _ in events:
+        if page is not None:
+            stages = pages.setdefault(page, {})
+            stages[name] = stages.get(name, 0) + duration
+    return pages
+
+
+def summary_table(events, slowest=10):
+    """Formats the aggregate per-stage totals and the slowest pages as text."""
+    totals = aggregate(events)
+    grand_total = sum(total for _, total, _ in totals.values()) or 1
+    lines = [f"{'stage':<14}{'calls':>8}{'total ms':>12}{'mean us':>10}{'share':>8}{'net blocks':>12}"]
+    for name, (count, total, allocated) in totals.items():
+        lines.append(f"{name:<14}{count:>8}{total / 1e6:>12.2f}{total / count / 1e3:>10.1f}"
+                     f"{total / grand_total:>8.1%}{allocated:>12}")
+    pages = per_page(events)
+    if pages:
+        lines.append("")
+        lines.append(f"slowest pages (of {len(pages)}):")
+        ranked = sorted(pages.items(), key=lambda item: sum(item[1].values()), reverse=True)
+        for page, stages in ranked[:slowest]:
+            breakdown = ", ".join(f"{name} {duration / 1e6:.2f}" for name, duration in stages.items())
+            lines.append(f"  {sum(stages.values()) / 1e6:8.2f} ms  {page}  ({breakdown})")
+    return "\n".join(lines)
+
+
+def write_trace(events, path):
+    """
+    Writes the events in Chrome's trace-event format, which chrome://tracing,
+    Perfetto and speedscope open as a flame graph.
+    """
+    origin = min((start for _, _, start, _, _, _ in events), default=0)
+    trace = []
+    for name, page, start, duration, blocks, pid in events:
+        args = {"allocated_blocks": blocks}
+        if page is not None:
+            args["page"] = page
+        trace.append({
+            "name": name,
+            "cat": "build",
+            "ph": "X",
+            "ts": (start - origin) / 1e3,
+            "dur": duration / 1e3,
+            "pid": pid,
+            "tid": pid,
+            "args": args,
+        })
+    with open(path, "w") as f:
+        json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
@@ -0,0 +1,76 @@
+import os
+import itertools
+from collections import deque
+from markdown_split import markdown_to_html_node, extract_title
+
+
+def render_document(markdown):
+    """Renders a markdown string to its (title, content html), without touching the disk."""
+    html = markdown_to_html_node(markdown).to_html()
+    return extract_title(markdown), html
+
+
+def _render_one(doc_id, markdown):
+    try:
+        title, html = render_document(markdown)
+    except Exception as e:
+        return doc_id, None, None, e
+    return doc_id, title, html, None
+
+
+def render_batch(batch):
+    """Renders a list of (id, markdown) pairs, see render_many for the results."""
+    return [_render_one(doc_id, markdown) for doc_id, markdown in batch]
+
+
+def _batches(docs, size):
+    docs = iter(docs)
+    while batch := list(itertools.islice(docs, size)):
+        yield batch
+
+
+def render_many(docs, jobs=1, chunksize=64):
+    """
+    Renders many in-memory markdown documents and yields one result per document,
+    in input order, as soon as it is ready:
+
+        for doc_id, title, html, error in render_many(cms_documents, jobs=None):
+            ...
+
+    A document that fails to render yields (doc_id, None, None, exception) and the
+    rest of the batch carries on.
+
+    Args:
+        docs (iterable): (id, markdown) pairs. Consumed lazily, so it may be a generator.
+        jobs (int | None): 1 renders in this process; otherwise documents are spread
+            over that many worker processes (None uses every core). Ids, markdown and
+            exceptions must then be picklable.
+        chunksize (int): Documents sent to a worker per task, so the inter-process
+            overhead is paid once per chunk rather than once per document.
+
+    Yields:
+        tuple: (id, title, html, error), with error None on success.
+    """
+    if jobs == 1:
+        for doc_id, markdown in docs:
+            yield _render_one(doc_id, markdown)
+        return
+
+    import logs
+    from concurrent.futures import ProcessPoolExecutor
+    workers = jobs or os.cpu_count() or 1
+    batches = _batches(docs, chunksize)
+    with ProcessPoolExecutor(max_workers=workers, **logs.pool_options()) as executor:
+        # Keep a couple of chunks queued per worker, so workers stay busy without
+        # the whole input being read into memory up front
+        pending = deque(executor.submit(render_batch, batch) for batch in itertools.islice(batches, workers * 2))
+        try:
+            while pending:
+                results = pending.popleft().result()
+                for batch in itertools.islice(batches, 1):
+                    pending.append(executor.submit(render_batch, batch))
+                yield from results
+        finally:
+            # A caller that stops iterating early does not wait for the queued chunks
+            for future in pending:
+                future.cancel()
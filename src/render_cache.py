@@ -0,0 +1,120 @@
+import os
+import json
+import shutil
+import hashlib
+import pageio
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+# Source files whose changes can change the rendered HTML
+PARSER_FILES = ("markdown_split.py", "textnode.py", "htmlnode.py")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_parser_version = None
+_open_caches = {}
+
+
+def parser_version():
+    """
+    Hash of the parser's own source. Editing markdown_split.py (or the node modules
+    it builds on) changes it, which invalidates every cached render.
+    """
+    global _parser_version
+    if _parser_version is None:
+        digest = hashlib.sha256()
+        for name in PARSER_FILES:
+            with open(os.path.join(SRC_DIR, name), "rb") as f:
+                digest.update(f.read())
+        _parser_version = digest.hexdigest()[:16]
+    return _parser_version
+
+
+class RenderCache():
+    """
+    Content-addressed store of rendered markdown under directory/<parser version>/.
+
+    Each entry maps the sha256 of a markdown document to its extract_title result,
+    content HTML and the link and image targets collected while rendering it. Hits refresh the entry's mtime, and once the cache grows past
+    max_bytes the least recently used entries are evicted.
+    """
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = directory
+        self.directory = os.path.join(directory, parser_version())
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.directory, exist_ok=True)
+        self._drop_other_versions()
+        self.size = sum(size for _, size, _ in self._entries())
+
+    def _drop_other_versions(self):
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if path != self.directory and os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _path(self, markdown):
+        key = hashlib.sha256(markdown.encode()).hexdigest()
+        return os.path.join(self.directory, key[:2], key + ".json")
+
+    def _entries(self):
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                yield entry.path, stat.st_size, stat.st_mtime_ns
+
+    def get(self, markdown):
+        """Returns the cached (title, html, links) for markdown, or None on a miss."""
+        path = self._path(markdown)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+            os.utime(path)
+            links = [(tag, url) for tag, url in entry["links"]]
+        except (OSError, ValueError, KeyError):
+            # Entries written before links were recorded count as misses and are replaced
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry["title"], entry["html"], links
+
+    def put(self, markdown, title, html, links=()):
+        path = self._path(markdown)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Written aside and renamed, so concurrent builds never read a half-written entry
+        with pageio.atomic_file(path) as f:
+            json.dump({"title": title, "html": html, "links": list(links)}, f)
+        self.size += os.path.getsize(path)
+        if self.size > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """Removes least recently used entries until the cache is below 90% of max_bytes."""
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        self.size = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for path, size, _ in entries:
+            if self.size <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self.size -= size
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+        os.makedirs(self.directory, exist_ok=True)
+        self.size = 0
+
+
+def open_cache(directory, max_bytes=DEFAULT_MAX_BYTES):
+    """Returns this process's RenderCache for directory, creating it on first use."""
+    cache = _open_caches.get(directory)
+    if cache is None:
+        cache = _open_caches[directory] = RenderCache(directory, max_bytes)
+    return cache
@@ -0,0 +1,87 @@
+import os
+import json
+import hashlib
+import pageio
+
+SHARD_MANIFEST = "shard.json"
+
+
+def parse_shard(spec):
+    """Parses an "INDEX/COUNT" shard spec such as "2/8" into (2, 8)."""
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"invalid shard {spec!r}, expected INDEX/COUNT such as 0/4")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"invalid shard {spec!r}, INDEX must be in 0..COUNT-1")
+    return index, count
+
+
+def shard_of(rel_path, count):
+    """
+    Returns the shard, 0..count-1, that owns the file at rel_path.
+
+    The assignment only depends on the path, hashed with blake2b rather than the
+    salted built-in hash(), so every node agrees on it across processes,
+    machines and Python versions.
+    """
+    digest = hashlib.blake2b(rel_path.replace(os.sep, "/").encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count
+
+
+def shard_root(shard_dir, index):
+    """The directory holding one shard's public/ tree and its manifest."""
+    return os.path.join(shard_dir, f"shard-{index}")
+
+
+def save_shard_manifest(root, index, count, outputs, links, build_id=None):
+    """
+    Records what a shard built: its outputs relative to its public/ directory and
+    the link index of its pages, keyed the same way, tagged with the build_id of
+    the shard run it belongs to. Written atomically, so the merge never reads the
+    manifest of a shard that did not finish.
+    """
+    path = os.path.join(root, SHARD_MANIFEST)
+    with pageio.atomic_file(path) as f:
+        json.dump({"index": index, "count": count, "build": build_id, "outputs": sorted(outputs), "links": links},
+                  f, separators=(",", ":"), sort_keys=True)
+
+
+def load_shard_manifests(shard_dir, build_id=None):
+    """
+    Loads the manifests of every shard under shard_dir, ordered by index.
+
+    With a build_id, manifests left by other builds are ignored, so a shard that
+    failed this time is reported missing rather than merged from an earlier run.
+    Raises ValueError unless the rest form one complete build: the same shard
+    count everywhere, every index present exactly once, and no output claimed by
+    two shards.
+    """
+    manifests = []
+    for name in sorted(os.listdir(shard_dir)) if os.path.isdir(shard_dir) else []:
+        path = os.path.join(shard_dir, name, SHARD_MANIFEST)
+        if name.startswith("shard-") and os.path.exists(path):
+            with open(path, "r") as f:
+                manifest = json.load(f)
+            if build_id is None or manifest.get("build") == build_id:
+                manifests.append(manifest)
+    if not manifests:
+        if build_id is not None:
+            raise ValueError(f"no shard manifests of build {build_id!r} in {shard_dir}")
+        raise ValueError(f"no shard manifests in {shard_dir}")
+    counts = {manifest["count"] for manifest in manifests}
+    if len(counts) != 1:
+        raise ValueError(f"shards from builds with different shard counts: {sorted(counts)}")
+    count = counts.pop()
+    manifests.sort(key=lambda manifest: manifest["index"])
+    indexes = [manifest["index"] for manifest in manifests]
+    if indexes != list(range(count)):
+        missing = sorted(set(range(count)) - set(indexes))
+        raise ValueError(f"incomplete shard set for {count} shards, missing {missing}")
+    owners = {}
+    for manifest in manifests:
+        for output in manifest["outputs"]:
+            if output in owners:
+                raise ValueError(f"{output} was built by shards {owners[output]} and {manifest['index']}")
+            owners[output] = manifest["index"]
+    return manifests
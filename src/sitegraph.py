@@ -0,0 +1,145 @@
+import os
+import hashlib
+import pageio
+from graphlib import TopologicalSorter
+from urllib.parse import urlsplit, unquote
+from markdown_split import extract_markdown_images
+
+
+def resolve_url(url, dest_path, dest_dir):
+    """
+    Returns the path below dest_dir that url points at when followed from the page
+    at dest_path, the way a browser resolves it: on public/blog/tom/index.html both
+    /images/tom.png and ../../images/tom.png give images/tom.png, and / gives ".".
+
+    Returns None for external URLs, bare fragments and paths leaving dest_dir.
+    """
+    parts = urlsplit(url)
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+    path = unquote(parts.path)
+    if path.startswith("/"):
+        rel_path = os.path.normpath(path.lstrip("/"))
+    else:
+        page_dir = os.path.relpath(os.path.dirname(dest_path), dest_dir)
+        rel_path = os.path.normpath(os.path.join(page_dir, path))
+    if rel_path.split(os.sep)[0] == "..":
+        return None
+    return rel_path
+
+
+def linked_static_files(markdown, dest_path, dest_dir, static_dir):
+    """
+    Returns the files under static_dir that markdown embeds as images, whether
+    they exist or not. External URLs are ignored.
+    """
+    files = set()
+    for _, url in extract_markdown_images(markdown):
+        rel_path = resolve_url(url, dest_path, dest_dir)
+        if rel_path is not None and rel_path != ".":
+            files.add(os.path.join(static_dir, rel_path))
+    return files
+
+
+class SiteGraph():
+    """
+    The site as a dependency graph between files. Every page output maps to the
+    inputs it is built from, its markdown, its template and the static images it
+    embeds:
+
+        public/blog/tom/index.html -> content/blog/tom/index.md, template.html,
+                                      static/images/tom.png
+
+    The reverse edges answer which outputs a changed input invalidates, and
+    schedule() orders outputs so that anything an output depends on is built
+    before it. The sha256 of each markdown file read for the graph is kept in
+    digests, so an incremental build does not read the file again to hash it.
+    """
+    def __init__(self, static_dir, dest_dir):
+        self.static_dir = static_dir
+        self.dest_dir = dest_dir
+        self.pages = {}         # output -> (from_path, template_path, dest_path)
+        self.sources = {}       # markdown path -> output
+        self.dependencies = {}  # output -> set of inputs
+        self.dependents = {}    # input -> set of outputs
+        self.digests = {}       # markdown path -> hex sha256 of the bytes read
+
+    def add_page(self, page, markdown=None):
+        """Adds page, or replaces it, re-reading its markdown unless it is given."""
+        from_path, template_path, dest_path = page
+        self.remove_page(dest_path)
+        if markdown is None:
+            digest = hashlib.sha256()
+            markdown = pageio.read_text(from_path, digest=digest)
+            self.digests[from_path] = digest.hexdigest()
+        inputs = {from_path, template_path}
+        inputs.update(linked_static_files(markdown, dest_path, self.dest_dir, self.static_dir))
+        self.pages[dest_path] = page
+        self.sources[from_path] = dest_path
+        self.dependencies[dest_path] = inputs
+        for path in inputs:
+            self.dependents.setdefault(path, set()).add(dest_path)
+
+    def remove_page(self, dest_path):
+        page = self.pages.pop(dest_path, None)
+        if page is None:
+            return
+        del self.sources[page[0]]
+        self.digests.pop(page[0], None)
+        for path in self.dependencies.pop(dest_path):
+            outputs = self.dependents[path]
+            outputs.discard(dest_path)
+            if not outputs:
+                del self.dependents[path]
+
+    def sync_pages(self, pages, changed=()):
+        """
+        Brings the graph in line with a freshly discovered list of pages. Pages that
+        are new, moved to another template or whose markdown is in changed are
+        re-read; the rest keep their edges.
+
+        Returns the outputs of the pages that no longer exist.
+        """
+        pages = {page[2]: page for page in pages}
+        gone = [dest_path for dest_path in self.pages if dest_path not in pages]
+        for dest_path in gone:
+            self.remove_page(dest_path)
+        for dest_path, page in pages.items():
+            if self.pages.get(dest_path) != page or page[0] in changed:
+                self.add_page(page)
+        return gone
+
+    def affected(self, paths):
+        """Returns every output that depends on any of paths, directly or through other outputs."""
+        affected = set()
+        stack = list(paths)
+        while stack:
+            for output in self.dependents.get(stack.pop(), ()):
+                if output not in affected:
+                    affected.add(output)
+                    stack.append(output)
+        return affected
+
+    def schedule(self, outputs):
+        """
+        Yields outputs in dependency order, in batches whose outputs do not depend on
+        each other and can be built in parallel. Raises graphlib.CycleError if the
+        outputs depend on each other in a cycle.
+        """
+        outputs = set(outputs)
+        sorter = TopologicalSorter()
+        for output in outputs:
+            sorter.add(output, *(path for path in self.dependencies[output] if path in outputs))
+        sorter.prepare()
+        while sorter.is_active():
+            batch = sorted(sorter.get_ready())
+            yield batch
+            sorter.done(*batch)
+
+
+def build_graph(pages, static_dir, dest_dir):
+    """Returns the SiteGraph of the given (markdown, template, output) pages."""
+    graph = SiteGraph(static_dir, dest_dir)
+    for page in pages:
+        graph.add_page(page)
+    return graph
@@ -0,0 +1,88 @@
+import os
+import re
+import pageio
+
+TEMPLATE_NAME = "template.html"
+# {{ Name }} placeholders; re.split keeps the placeholder and its name in the result
+SLOT = re.compile(r"(\{\{ *([A-Za-z_]\w*) *\}\})")
+
+_cache = {}
+
+
+class Template():
+    """
+    A template parsed once into literal segments and named slots.
+
+    "<title>{{ Title }}</title>" becomes literals ["<title>", "</title>"] and
+    slots [("Title", "{{ Title }}")], so rendering is a single pass over the
+    segments instead of one str.replace scan per placeholder.
+    """
+    def __init__(self, source, path=None):
+        self.path = path
+        pieces = SLOT.split(source)
+        self.literals = pieces[0::3]
+        self.slots = list(zip(pieces[2::3], pieces[1::3]))
+
+    @property
+    def names(self):
+        return {name for name, _ in self.slots}
+
+    def render_into(self, write, values):
+        """
+        Writes the rendered template to write.
+
+        A value can be a string or an HTMLNode, which is streamed with its own
+        render_into. Slots without a value are written back unchanged.
+        """
+        write(self.literals[0])
+        for (name, placeholder), literal in zip(self.slots, self.literals[1:]):
+            value = values.get(name, placeholder)
+            if isinstance(value, str):
+                write(value)
+            else:
+                value.render_into(write)
+            write(literal)
+
+    def render(self, values):
+        parts = []
+        self.render_into(parts.append, values)
+        return "".join(parts)
+
+    def __repr__(self):
+        return f"Template(path={self.path!r}, slots={[name for name, _ in self.slots]!r})"
+
+
+def load_template(path):
+    """
+    Returns the parsed Template for path, reading the file only when it is new or
+    its mtime changed since it was last loaded.
+    """
+    path = os.path.abspath(path)
+    mtime = os.stat(path).st_mtime_ns
+    cached = _cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    template = Template(pageio.read_text(path), path)
+    _cache[path] = (mtime, template)
+    return template
+
+
+def clear_template_cache():
+    _cache.clear()
+
+
+def template_for(from_path, content_dir, default_template):
+    """
+    Finds the template for a markdown file: the nearest template.html in its
+    directory or any parent directory up to content_dir, e.g.
+    content/blog/template.html for every page under content/blog/.
+    Falls back to default_template.
+    """
+    content_dir = os.path.abspath(content_dir)
+    directory = os.path.dirname(os.path.abspath(from_path))
+    while directory == content_dir or directory.startswith(content_dir + os.sep):
+        candidate = os.path.join(directory, TEMPLATE_NAME)
+        if os.path.isfile(candidate):
+            return candidate
+        directory = os.path.dirname(directory)
+    return default_template
@@ -0,0 +1,79 @@
+import os
+import logging
+import unittest
+
+from assets import sync_assets, prune_extraneous
+from fixtures import TempDirTestCase
+
+
+class TestSyncAssets(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        logging.disable(logging.CRITICAL)
+        self.source = os.path.join(self.root, "static")
+        self.dest = os.path.join(self.root, "public")
+        self.write("index.css", "body {}", root=self.source)
+        self.write("images/tom.png", "png bytes", root=self.source)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def read(self, rel):
+        with open(os.path.join(self.dest, rel)) as f:
+            return f.read()
+
+    def test_copies_tree(self):
+        result = sync_assets(self.source, self.dest)
+        self.assertEqual(len(result.copied), 2)
+        self.assertEqual(self.read("images/tom.png"), "png bytes")
+        self.assertEqual(
+            sorted(result.outputs),
+            [os.path.join(self.dest, "images/tom.png"), os.path.join(self.dest, "index.css")],
+        )
+
+    def test_skips_unchanged_files(self):
+        sync_assets(self.source, self.dest)
+        result = sync_assets(self.source, self.dest)
+        self.assertEqual(result.copied, [])
+        self.assertEqual(len(result.skipped), 2)
+
+    def test_recopies_changed_files(self):
+        sync_assets(self.source, self.dest)
+        path = self.write("index.css", "body { color: red }", root=self.source)
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000_000))
+        result = sync_assets(self.source, self.dest)
+        self.assertEqual(result.copied, [os.path.join(self.dest, "index.css")])
+        self.assertEqual(self.read("index.css"), "body { color: red }")
+
+    def test_hardlink_mode(self):
+        sync_assets(self.source, self.dest, mode="hardlink")
+        source_stat = os.stat(os.path.join(self.source, "index.css"))
+        dest_stat = os.stat(os.path.join(self.dest, "index.css"))
+        self.assertEqual(source_stat.st_ino, dest_stat.st_ino)
+
+    def test_reflink_mode(self):
+        sync_assets(self.source, self.dest, mode="reflink")
+        self.assertEqual(self.read("images/tom.png"), "png bytes")
+        result = sync_assets(self.source, self.dest, mode="reflink")
+        self.assertEqual(len(result.skipped), 2)
+
+    def test_include_filters_by_relative_path(self):
+        result = sync_assets(self.source, self.dest, include=lambda rel: rel.startswith("images"))
+        self.assertEqual(list(result.outputs), [os.path.join(self.dest, "images/tom.png")])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "index.css")))
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            sync_assets(self.source, self.dest, mode="symlink")
+
+    def test_prune_extraneous(self):
+        result = sync_assets(self.source, self.dest)
+        stale = self.write("old/page.html", "x", root=self.dest)
+        removed = prune_extraneous(self.dest, set(result.outputs))
+        self.assertEqual(removed, [stale])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "old")))
+        self.assertEqual(self.read("index.css"), "body {}")
+
+
+if __name__ == "__main__":
+    unittest.main()
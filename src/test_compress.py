@@ -0,0 +1,74 @@
+import os
+import gzip
+import unittest
+
+import compress
+from compress import compress_file, precompress, remove_siblings
+from fixtures import TempDirTestCase
+
+
+class TestPrecompress(TempDirTestCase):
+    def test_writes_gzip_sibling(self):
+        page = self.write("index.html", b"<p>hello</p>" * 100)
+        written, kept = compress_file(page, [".gz"])
+        self.assertEqual((written, kept), ([page + ".gz"], []))
+        with gzip.open(page + ".gz", "rb") as f:
+            self.assertEqual(f.read(), b"<p>hello</p>" * 100)
+
+    def test_output_is_deterministic(self):
+        page = self.write("index.html", b"<p>hello</p>" * 100)
+        compress_file(page, [".gz"])
+        with open(page + ".gz", "rb") as f:
+            first = f.read()
+        os.utime(page, ns=(0, os.stat(page + ".gz").st_mtime_ns + 1))
+        compress_file(page, [".gz"])
+        with open(page + ".gz", "rb") as f:
+            self.assertEqual(f.read(), first)
+
+    def test_skips_newer_sibling(self):
+        page = self.write("index.html", b"<p>hello</p>" * 100)
+        compress_file(page, [".gz"])
+        sibling_mtime = os.stat(page + ".gz").st_mtime_ns
+        os.utime(page, ns=(sibling_mtime - 10, sibling_mtime - 10))
+        self.assertEqual(compress_file(page, [".gz"]), ([], [page + ".gz"]))
+        os.utime(page, ns=(sibling_mtime + 10, sibling_mtime + 10))
+        self.assertEqual(compress_file(page, [".gz"]), ([page + ".gz"], []))
+
+    def test_incompressible_removes_stale_sibling(self):
+        noise = self.write("noise.txt", os.urandom(4096))
+        self.write("noise.txt.gz", b"stale")
+        os.utime(noise, ns=(0, os.stat(noise + ".gz").st_mtime_ns + 1))
+        self.assertEqual(compress_file(noise, [".gz"]), ([], []))
+        self.assertFalse(os.path.exists(noise + ".gz"))
+
+    def test_precompress_selects_compressible_outputs(self):
+        paths = [
+            self.write("index.html", b"<p>hello</p>" * 100),
+            self.write("site.css", b"body { color: red; }\n" * 50),
+            self.write("tiny.html", b"<p></p>"),
+            self.write("photo.png", b"\x89PNG" * 1000),
+            os.path.join(self.root, "missing.html"),
+        ]
+        result = precompress(paths, jobs=2, extensions=[".gz"])
+        self.assertEqual(sorted(result.written), [paths[0] + ".gz", paths[1] + ".gz"])
+        self.assertEqual(result.failed, [])
+        again = precompress(paths, jobs=2, extensions=[".gz"])
+        self.assertEqual((again.written, sorted(again.outputs)), ([], sorted(result.outputs)))
+
+    @unittest.skipIf(compress.brotli is None, "brotli is not installed")
+    def test_brotli_sibling(self):
+        page = self.write("index.html", b"<p>hello</p>" * 100)
+        self.assertEqual(compress_file(page, [".br"])[0], [page + ".br"])
+
+    def test_remove_siblings(self):
+        page = self.write("index.html", b"<p>hello</p>" * 100)
+        photo = self.write("photo.png", b"\x89PNG" * 1000)
+        compress_file(page, [".gz"])
+        asset = self.write("photo.png.gz", b"an asset")
+        self.assertEqual(remove_siblings([page, photo]), [page + ".gz"])
+        self.assertEqual(remove_siblings([page]), [])
+        self.assertTrue(os.path.exists(asset))
+
+
+if __name__ == "__main__":
+    unittest.main()
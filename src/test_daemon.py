@@ -0,0 +1,113 @@
+import json
+import time
+import threading
+import unittest
+import urllib.error
+import urllib.request
+
+from daemon import RenderService, Overloaded, make_server
+
+
+class RecordingService(RenderService):
+    """Records builds instead of building the site, and holds each one until released."""
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.started = threading.Event()
+        self.proceed = threading.Event()
+        self.full_builds = []
+
+    def run_build(self, full):
+        self.full_builds.append(full)
+        self.started.set()
+        self.proceed.wait(5)
+
+
+class TestRenderService(unittest.TestCase):
+    def setUp(self):
+        self.service = RecordingService(jobs=1, queue_size=2)
+
+    def tearDown(self):
+        self.service.close()
+
+    def test_render(self):
+        results = self.service.render([("a", "# A"), ("b", "no title")] * 40)
+        self.assertEqual(len(results), 80)
+        self.assertEqual(results[0], ("a", "A", "<div><h1>A</h1></div>", None))
+        self.assertIsInstance(results[1][3], Exception)
+
+    def test_admit_is_bounded(self):
+        self.service.admit()
+        self.service.admit()
+        with self.assertRaises(Overloaded):
+            self.service.admit()
+        self.service.release()
+        self.service.admit()
+        self.assertEqual(self.service.status()["rejected"], 1)
+
+    def test_builds_are_coalesced(self):
+        results = []
+        first = threading.Thread(target=lambda: results.append(self.service.build()))
+        first.start()
+        self.assertTrue(self.service.started.wait(5))
+        # Both arrive while the first build runs, so one more build covers them
+        waiting = [threading.Thread(target=lambda full=full: results.append(self.service.build(full=full)))
+                   for full in (False, True)]
+        for thread in waiting:
+            thread.start()
+        while self.service._build_requested < 3:
+            time.sleep(0.01)
+        self.service.proceed.set()
+        for thread in [first] + waiting:
+            thread.join(5)
+        self.assertEqual(self.service.full_builds, [False, True])
+        self.assertEqual(sorted(coalesced for _, coalesced in results), [False, True, True])
+
+    def test_interrupted_build_does_not_block_later_builds(self):
+        def interrupt(full):
+            raise KeyboardInterrupt
+        self.service.run_build = interrupt
+        with self.assertRaises(KeyboardInterrupt):
+            self.service.build()
+        self.service.run_build = lambda full: None
+        seconds, coalesced = self.service.build()
+        self.assertFalse(coalesced)
+        self.assertEqual(self.service.status()["builds"], 2)
+
+
+class TestDaemonServer(unittest.TestCase):
+    def setUp(self):
+        self.service = RecordingService(jobs=1, queue_size=1)
+        self.server = make_server(self.service, port=0)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://localhost:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.service.close()
+
+    def request(self, path, body=None):
+        data = None if body is None else json.dumps(body).encode()
+        try:
+            with urllib.request.urlopen(urllib.request.Request(self.url + path, data=data)) as response:
+                return response.status, json.load(response)
+        except urllib.error.HTTPError as e:
+            return e.code, json.load(e)
+
+    def test_render_endpoint(self):
+        status, body = self.request("/render", {"docs": [["a", "# A"], ["b", "no title"]]})
+        self.assertEqual(status, 200)
+        self.assertEqual(body["results"][0], {"id": "a", "title": "A", "html": "<div><h1>A</h1></div>", "error": None})
+        self.assertEqual(body["results"][1]["error"], "Header not found")
+
+    def test_errors(self):
+        self.assertEqual(self.request("/nope", {})[0], 404)
+        self.assertEqual(self.request("/render", {"documents": []})[0], 400)
+        self.service.admit()
+        self.assertEqual(self.request("/render", {"docs": []})[0], 503)
+        self.service.release()
+        self.assertEqual(self.request("/status")[1]["rejected"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
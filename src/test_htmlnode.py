@@ -1,6 +1,8 @@
+import html
 import unittest
 
-from htmlnode import HTMLNode, LeafNode
+import htmlnode
+from htmlnode import HTMLNode, LeafNode, ParentNode, CodeNode, escape_text
 
 class TestTextNode(unittest.TestCase):
 
@@ -33,6 +35,33 @@ class TestTextNode(unittest.TestCase):
         node = LeafNode("", "Hello, world!")
         self.assertEqual(node.to_html(), "Hello, world!")
 
+    def test_nodes_are_slotted(self):
+        for node in (HTMLNode("p"), LeafNode("p", "x"), ParentNode("div", []), CodeNode("x")):
+            self.assertFalse(hasattr(node, "__dict__"))
+
+    # CodeNode tests
+    def test_code_node_renders_escaped_span(self):
+        node = CodeNode("```a < b && c > \"d\"```", 3, 19)
+        self.assertEqual(node.text, 'a < b && c > "d"')
+        self.assertEqual(node.to_html(), '<code>a &lt; b &amp;&amp; c &gt; "d"</code>')
+
+    def test_code_node_escapes_across_chunks(self):
+        original = htmlnode.ESCAPE_CHUNK_SIZE
+        htmlnode.ESCAPE_CHUNK_SIZE = 3
+        try:
+            self.assertEqual(CodeNode("x<y&&z>", 1, 7).to_html(), "<code>&lt;y&amp;&amp;z&gt;</code>")
+        finally:
+            htmlnode.ESCAPE_CHUNK_SIZE = original
+
+    def test_escape_text_matches_html_escape(self):
+        text = 'a & b <c> "d" \'e\''
+        self.assertEqual(escape_text(text), html.escape(text, quote=False))
+        plain = "nothing to escape"
+        self.assertIs(escape_text(plain), plain)
+
+    def test_code_node_empty_span(self):
+        self.assertEqual(ParentNode("pre", [CodeNode("``````", 3, 3)]).to_html(), "<pre><code></code></pre>")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,43 @@
+import os
+import unittest
+
+from linkcheck import check_links, is_served
+
+PUBLIC = os.path.join("site", "public")
+
+
+def out(*parts):
+    return os.path.join(PUBLIC, *parts)
+
+
+class TestLinkCheck(unittest.TestCase):
+    outputs = {out("index.html"), out("blog", "tom", "index.html"), out("images", "tom.png")}
+
+    def test_is_served(self):
+        self.assertTrue(is_served(".", self.outputs, PUBLIC))
+        self.assertTrue(is_served("blog/tom", self.outputs, PUBLIC))
+        self.assertTrue(is_served("images/tom.png", self.outputs, PUBLIC))
+        self.assertFalse(is_served("blog", self.outputs, PUBLIC))
+
+    def test_reports_only_dangling_internal_targets(self):
+        index = {
+            out("index.html"): [
+                ("a", "/blog/tom"), ("a", "/blog/tom/"), ("img", "/images/tom.png"),
+                ("a", "https://example.com/missing"), ("a", "#top"), ("a", "mailto:me@example.com"),
+                ("a", "/contact"), ("a", "/contact"),
+            ],
+            out("blog", "tom", "index.html"): [
+                ("a", "/"), ("img", "../../images/tom.png"), ("img", "tom.png"),
+            ],
+        }
+        self.assertEqual(check_links(index, self.outputs, PUBLIC), [
+            (out("blog", "tom", "index.html"), "img", "tom.png"),
+            (out("index.html"), "a", "/contact"),
+        ])
+
+    def test_empty_index(self):
+        self.assertEqual(check_links({}, self.outputs, PUBLIC), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
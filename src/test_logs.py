@@ -0,0 +1,98 @@
+import io
+import os
+import logging
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from logs import BatchingHandler, configure_logging, pool_options
+
+
+def log_from_worker(message):
+    logging.getLogger("worker").warning("%s from %d", message, os.getpid())
+    return os.getpid()
+
+
+class CountingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+class TestBatchingHandler(unittest.TestCase):
+    def make_record(self, msg, level=logging.INFO, args=()):
+        return logging.LogRecord("test", level, __file__, 1, msg, args, None)
+
+    def test_buffers_until_capacity(self):
+        stream = CountingStream()
+        handler = BatchingHandler([stream], capacity=3)
+        handler.emit(self.make_record("one"))
+        handler.emit(self.make_record("two"))
+        self.assertEqual(stream.getvalue(), "")
+        handler.emit(self.make_record("three %d", args=(3,)))
+        self.assertEqual(stream.getvalue(), "one\ntwo\nthree 3\n")
+        self.assertEqual(stream.writes, 1)
+
+    def test_warnings_flush_immediately(self):
+        stream = CountingStream()
+        handler = BatchingHandler([stream], capacity=100)
+        handler.emit(self.make_record("info"))
+        handler.emit(self.make_record("careful", level=logging.WARNING))
+        self.assertEqual(stream.getvalue(), "info\ncareful\n")
+
+    def test_explicit_flush(self):
+        stream = CountingStream()
+        handler = BatchingHandler([stream])
+        handler.emit(self.make_record("queued"))
+        handler.flush()
+        handler.flush()
+        self.assertEqual((stream.getvalue(), stream.writes), ("queued\n", 1))
+
+
+class TestConfigureLogging(unittest.TestCase):
+    def setUp(self):
+        self.root = logging.getLogger()
+        self.saved = (self.root.handlers[:], self.root.level)
+
+    def tearDown(self):
+        handlers, level = self.saved
+        self.root.handlers[:] = handlers
+        self.root.setLevel(level)
+
+    def test_records_reach_log_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "build.log")
+            build_log = configure_logging(path)
+            build_log.handler.streams = [build_log.log_file]  # keep test output quiet
+            logging.getLogger("test").info("Copied %d files", 3)
+            logging.getLogger("test").debug("hidden")
+            build_log.stop()
+            with open(path) as f:
+                text = f.read()
+        self.assertIn("INFO - Copied 3 files", text)
+        self.assertNotIn("hidden", text)
+
+    def test_records_from_pool_workers_reach_log_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "build.log")
+            build_log = configure_logging(path)
+            build_log.handler.streams = [build_log.log_file]
+            try:
+                with ProcessPoolExecutor(max_workers=1, **pool_options()) as executor:
+                    pid = executor.submit(log_from_worker, "hello").result()
+            finally:
+                build_log.stop()
+            with open(path) as f:
+                text = f.read()
+        self.assertNotEqual(pid, os.getpid())
+        self.assertIn(f"WARNING - hello from {pid}", text)
+        # Stopped logging leaves no feeder thread behind for later forks to copy
+        self.assertNotIn("initializer", pool_options())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,291 @@
+import io
+import os
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from unittest import mock
+
+import main
+from fixtures import TempDirTestCase
+
+TEMPLATE = "<title>{{ Title }}</title><main>{{ Content }}</main>"
+
+
+class ProjectTestCase(TempDirTestCase):
+    """Points main's project paths at a small site in self.root."""
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.multiple(
+            main,
+            PROJECT_ROOT=self.root,
+            STATIC_PATH=os.path.join(self.root, "static"),
+            PUBLIC_PATH=os.path.join(self.root, "public"),
+            CONTENT_PATH=os.path.join(self.root, "content"),
+            TEMPLATE_PATH=os.path.join(self.root, "template.html"),
+            MANIFEST_PATH=os.path.join(self.root, ".build_manifest.json"),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.manifest_path = main.MANIFEST_PATH
+        self.write("template.html", TEMPLATE)
+        self.write("static/index.css", "body { margin: 0; }\n" * 50)
+        self.write("content/index.md", "# Home\n\n" + "A paragraph of *text*.\n\n" * 30)
+
+    def public(self, rel):
+        return os.path.join(self.root, "public", rel)
+
+    def write_site(self, pages=6):
+        """Adds blog posts with code, lists, quotes, links and an image, and a section template."""
+        self.write("static/images/photo.png", b"\x89PNG" * 100)
+        self.write("content/blog/template.html", "<body class=blog>{{ Content }}</body><title>{{ Title }}</title>")
+        for i in range(pages):
+            self.write(f"content/blog/post-{i}/index.md",
+                       f"# Post {i}\n\nSome **bold** and _italic_ text with `code`.\n\n"
+                       f"> A quote\n\n- one\n- two\n\n1. first\n2. second\n\n"
+                       f"```\nprint({i} < 2)\n```\n\n"
+                       f"[Home](/) and ![a photo](/images/photo.png)")
+
+    def outputs(self):
+        """Every file below public/, mapped to its bytes."""
+        outputs = {}
+        public = self.public("")
+        for root, _, files in os.walk(public):
+            for name in files:
+                with open(os.path.join(root, name), "rb") as f:
+                    outputs[os.path.relpath(os.path.join(root, name), public)] = f.read()
+        return outputs
+
+    def incremental_build(self, **kwargs):
+        main.incremental_build(manifest_path=self.manifest_path, **kwargs)
+
+
+class TestParseArgs(unittest.TestCase):
+    def parse_error(self, argv):
+        with redirect_stderr(io.StringIO()) as stderr, self.assertRaises(SystemExit):
+            main.parse_args(argv)
+        return stderr.getvalue()
+
+    def test_jobs(self):
+        self.assertEqual(main.parse_args([]).jobs, 1)
+        self.assertEqual(main.parse_args(["--jobs", "0"]).jobs, 0)
+        self.assertEqual(main.parse_args(["-j", "4"]).jobs, 4)
+
+    def test_rejects_negative_jobs(self):
+        self.assertIn("invalid job count -1", self.parse_error(["--jobs", "-1"]))
+        self.assertIn("expected an integer", self.parse_error(["--jobs", "many"]))
+
+
+class TestCli(ProjectTestCase):
+    def cli(self, argv):
+        with mock.patch.object(main, "start_logging", return_value=(mock.Mock(), "build.log")) as start_logging, \
+                redirect_stdout(io.StringIO()):
+            main.cli(argv)
+        return start_logging
+
+    def test_incomplete_shard_set_is_a_usage_error(self):
+        shard_dir = os.path.join(self.root, "shards")
+        start_logging = self.cli(["--shard", "0/2", "--shard-dir", shard_dir, "--build-id", "b1"])
+        # Shards started in the same second log to files of their own
+        start_logging.assert_called_once_with(suffix="_shard-0")
+        with redirect_stderr(io.StringIO()) as stderr, self.assertRaises(SystemExit) as exit:
+            self.cli(["--merge-shards", "--shard-dir", shard_dir, "--build-id", "b1"])
+        self.assertEqual(exit.exception.code, 2)
+        self.assertIn("error: incomplete shard set for 2 shards, missing [1]", stderr.getvalue())
+
+
+class TestGeneratePage(ProjectTestCase):
+    def render(self, template, cache=None):
+        template_path = self.write("content/template.html", template)
+        dest_path = self.public("index.html")
+        links = main.generate_page(os.path.join(self.root, "content", "index.md"), template_path, dest_path, cache)
+        with open(dest_path) as f:
+            return f.read(), links
+
+    def test_content_used_twice(self):
+        self.write("content/index.md", "# Home\n\nSee [the blog](/blog/).")
+        html, links = self.render("{{ Content }}<hr>{{ Content }}")
+        content = '<div><h1>Home</h1><p>See <a href="/blog/">the blog</a>.</p></div>'
+        self.assertEqual(html, content + "<hr>" + content)
+        self.assertEqual(links, [("a", "/blog/")])
+
+
+class TestBuilds(ProjectTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write_site()
+
+    def test_noop_incremental_build_regenerates_nothing(self):
+        self.incremental_build()
+        before = self.outputs()
+        with mock.patch.object(main, "generate_page", wraps=main.generate_page) as generate_page:
+            self.incremental_build()
+        generate_page.assert_not_called()
+        self.assertEqual(self.outputs(), before)
+
+    def test_incremental_build_reads_markdown_once(self):
+        self.incremental_build()
+        # The site graph hashes the markdown it reads, so only templates are hashed again
+        with mock.patch.object(main.manifest, "file_digest", wraps=main.manifest.file_digest) as file_digest:
+            self.incremental_build()
+        self.assertEqual(sorted(call.args[0] for call in file_digest.call_args_list),
+                         [os.path.join(self.root, "content", "blog", "template.html"),
+                          os.path.join(self.root, "template.html")])
+
+    def test_incremental_build_regenerates_changed_pages(self):
+        self.incremental_build()
+        self.write("content/blog/post-2/index.md", "# Edited\n\nNew text.")
+        with mock.patch.object(main, "generate_page", wraps=main.generate_page) as generate_page:
+            self.incremental_build()
+        self.assertEqual([call.args[0] for call in generate_page.call_args_list],
+                         [os.path.join(self.root, "content", "blog", "post-2", "index.md")])
+        self.assertIn(b"<h1>Edited</h1>", self.outputs()[os.path.join("blog", "post-2", "index.html")])
+
+    def test_deleted_sources_remove_their_outputs(self):
+        self.incremental_build()
+        os.remove(os.path.join(self.root, "content", "blog", "post-1", "index.md"))
+        os.remove(os.path.join(self.root, "static", "images", "photo.png"))
+        with self.assertLogs(main.logger, "WARNING") as logs:
+            self.incremental_build()
+        self.assertIn("Broken image in public/blog/post-0/index.html: /images/photo.png", logs.output[0])
+        outputs = self.outputs()
+        self.assertNotIn(os.path.join("blog", "post-1", "index.html"), outputs)
+        self.assertNotIn(os.path.join("images", "photo.png"), outputs)
+        self.assertFalse(os.path.exists(self.public(os.path.join("blog", "post-1"))))
+        self.assertIn(os.path.join("blog", "post-0", "index.html"), outputs)
+
+    def test_full_and_incremental_builds_agree(self):
+        main.main()
+        full = self.outputs()
+        self.incremental_build()
+        self.assertEqual(self.outputs(), full)
+
+    def test_parallel_output_equals_serial(self):
+        pages = main.site_pages()
+        serial_index = main.generate_pages(pages, jobs=1)
+        serial = self.outputs()
+        for path in serial_index:
+            os.remove(path)
+        parallel_index = main.generate_pages(pages, jobs=2, chunksize=1)
+        self.assertEqual(self.outputs(), serial)
+        self.assertEqual(parallel_index, serial_index)
+
+    def test_streaming_cached_and_profiled_paths_agree(self):
+        import profiling
+        import render_cache
+        pages = main.site_pages()
+
+        def build(**kwargs):
+            index = {page[2]: main.generate_page(*page, **kwargs) for page in pages}
+            outputs = self.outputs()
+            for path in index:
+                os.remove(path)
+            return outputs, index
+
+        streamed = build()
+        cache = render_cache.open_cache(os.path.join(self.root, ".cache"))
+        # Once filling the cache, once from it
+        self.assertEqual(build(cache=cache), streamed)
+        self.assertEqual(build(cache=cache), streamed)
+        # Block cache misses are classified and parsed, hits only looked up
+        main.ms.clear_block_cache()
+        profiling.enable()
+        try:
+            self.assertEqual(build(), streamed)
+        finally:
+            events = profiling.disable()
+        self.assertEqual({name for name, *_ in events},
+                         {"template", "read", "block-split", "classify", "inline-parse", "render", "write"})
+        self.assertEqual({page for _, page, *_ in events}, {page[0] for page in pages})
+
+
+class TestApplyChanges(ProjectTestCase):
+    """The watch server's handler, called as watch.watch would with a change set."""
+    def setUp(self):
+        super().setUp()
+        self.write_site(pages=3)
+        self.incremental_build()
+        self.graph = main.site_graph()
+
+    def apply(self, changed=(), removed=()):
+        with mock.patch.object(main, "generate_page", wraps=main.generate_page) as generate_page:
+            main.apply_changes(self.graph, set(changed), set(removed))
+        return sorted(os.path.relpath(call.args[2], self.public("")) for call in generate_page.call_args_list)
+
+    def content(self, rel):
+        return os.path.join(self.root, "content", rel)
+
+    def read(self, rel):
+        with open(self.public(rel)) as f:
+            return f.read()
+
+    def test_edited_page(self):
+        path = self.write("content/blog/post-1/index.md", "# Edited")
+        self.assertEqual(self.apply(changed=[path]), [os.path.join("blog", "post-1", "index.html")])
+        self.assertIn("<h1>Edited</h1>", self.read(os.path.join("blog", "post-1", "index.html")))
+
+    def test_added_and_removed_pages(self):
+        added = self.write("content/about/index.md", "# About")
+        os.remove(self.content(os.path.join("blog", "post-2", "index.md")))
+        generated = self.apply(changed=[added], removed=[self.content(os.path.join("blog", "post-2", "index.md"))])
+        self.assertEqual(generated, [os.path.join("about", "index.html")])
+        self.assertEqual(self.read(os.path.join("about", "index.html")),
+                         "<title>About</title><main><div><h1>About</h1></div></main>")
+        self.assertFalse(os.path.exists(self.public(os.path.join("blog", "post-2"))))
+        self.assertIn(self.public(os.path.join("about", "index.html")), self.graph.pages)
+        self.assertNotIn(self.public(os.path.join("blog", "post-2", "index.html")), self.graph.pages)
+
+    def test_section_template_appears_and_goes(self):
+        template = self.write("content/blog/post-0/template.html", "<article>{{ Content }}</article>")
+        self.assertEqual(self.apply(changed=[template]), [os.path.join("blog", "post-0", "index.html")])
+        self.assertTrue(self.read(os.path.join("blog", "post-0", "index.html")).startswith("<article><div>"))
+        os.remove(template)
+        self.assertEqual(self.apply(removed=[template]), [os.path.join("blog", "post-0", "index.html")])
+        self.assertTrue(self.read(os.path.join("blog", "post-0", "index.html")).startswith("<body class=blog>"))
+
+    def test_static_files(self):
+        photo = os.path.join(self.root, "static", "images", "photo.png")
+        self.write(photo, b"\x89PNG new")
+        # Pages embedding the image are regenerated too
+        self.assertEqual(self.apply(changed=[photo]),
+                         [os.path.join("blog", f"post-{i}", "index.html") for i in range(3)])
+        with open(self.public(os.path.join("images", "photo.png")), "rb") as f:
+            self.assertEqual(f.read(), b"\x89PNG new")
+        os.remove(photo)
+        self.apply(removed=[photo])
+        self.assertFalse(os.path.exists(self.public("images")))
+        self.assertTrue(os.path.exists(self.public("index.css")))
+
+
+class TestPrecompressedSiblings(ProjectTestCase):
+    def siblings(self):
+        return sorted(name for name in os.listdir(self.public("")) if name.endswith(".gz"))
+
+    def test_incremental_build_removes_siblings_of_a_full_build(self):
+        main.main(precompress=True)
+        self.assertEqual(self.siblings(), ["index.css.gz", "index.html.gz"])
+        self.incremental_build()
+        self.assertEqual(self.siblings(), [])
+
+    def test_incremental_build_removes_its_own_siblings(self):
+        self.incremental_build(precompress=True)
+        self.assertEqual(self.siblings(), ["index.css.gz", "index.html.gz"])
+        self.incremental_build()
+        self.assertEqual(self.siblings(), [])
+
+    def test_only_sweeps_without_a_manifest(self):
+        self.incremental_build()
+        with mock.patch("compress.remove_siblings") as remove_siblings:
+            self.incremental_build()
+        remove_siblings.assert_not_called()
+        main.main()
+        with mock.patch("compress.remove_siblings", return_value=[]) as remove_siblings:
+            self.incremental_build()
+        remove_siblings.assert_called_once()
+
+    def test_keeps_assets_named_like_siblings(self):
+        self.write("static/index.css.gz", b"an asset, not a sibling")
+        self.incremental_build()
+        self.assertEqual(self.siblings(), ["index.css.gz"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import json
+import unittest
+
+from manifest import (
+    MANIFEST_VERSION,
+    file_digest,
+    load_manifest,
+    load_links,
+    save_manifest,
+    needs_rebuild,
+    remove_output,
+)
+from fixtures import TempDirTestCase
+
+
+class TestManifest(TempDirTestCase):
+
+    def test_digest_changes_with_content(self):
+        path = self.write("a.md", "# one")
+        first = file_digest(path)
+        self.assertEqual(first, file_digest(path))
+        self.write("a.md", "# two")
+        self.assertNotEqual(first, file_digest(path))
+
+    def test_roundtrip(self):
+        path = os.path.join(self.root, "manifest.json")
+        outputs = {"public/index.html": {"content/index.md": "abc", "template.html": "def"}}
+        save_manifest(path, outputs)
+        self.assertEqual(load_manifest(path), outputs)
+        self.assertEqual(load_links(path), {})
+
+    def test_links_roundtrip(self):
+        path = os.path.join(self.root, "manifest.json")
+        links = {"public/index.html": [("a", "/blog/tom"), ("img", "/images/tom.png")]}
+        save_manifest(path, {}, links)
+        self.assertEqual(load_links(path), links)
+
+    def test_missing_manifest_is_empty(self):
+        self.assertEqual(load_manifest(os.path.join(self.root, "nope.json")), {})
+
+    def test_corrupt_manifest_is_empty(self):
+        path = self.write("manifest.json", "{not json")
+        self.assertEqual(load_manifest(path), {})
+
+    def test_other_version_is_empty(self):
+        path = self.write("manifest.json", json.dumps({"version": MANIFEST_VERSION + 1, "outputs": {"x": {}}}))
+        self.assertEqual(load_manifest(path), {})
+
+    def test_needs_rebuild(self):
+        dest = self.write("public/index.html", "<html></html>")
+        old = {"public/index.html": {"content/index.md": "abc"}}
+        self.assertFalse(needs_rebuild(old, "public/index.html", {"content/index.md": "abc"}, dest))
+        self.assertTrue(needs_rebuild(old, "public/index.html", {"content/index.md": "xyz"}, dest))
+        self.assertTrue(needs_rebuild({}, "public/index.html", {"content/index.md": "abc"}, dest))
+        os.remove(dest)
+        self.assertTrue(needs_rebuild(old, "public/index.html", {"content/index.md": "abc"}, dest))
+
+    def test_remove_output_prunes_empty_dirs(self):
+        public = os.path.join(self.root, "public")
+        dest = self.write("public/blog/tom/index.html", "x")
+        self.write("public/index.html", "x")
+        remove_output(dest, public)
+        self.assertFalse(os.path.exists(os.path.join(public, "blog")))
+        self.assertTrue(os.path.exists(os.path.join(public, "index.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
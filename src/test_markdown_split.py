@@ -1,3 +1,4 @@
+import io
 import unittest
 from markdown_split import (
     split_nodes_delimiter,
@@ -6,9 +7,19 @@ from markdown_split import (
     split_nodes_image,
     split_nodes_link,
     text_to_textnodes,
+    text_to_textnodes_chained,
+    text_to_textnodes_single_pass,
+    set_inline_tokenizer,
+    INLINE_TOKENIZERS,
     markdown_to_blocks,
+    iter_markdown_blocks,
+    BlockStream,
+    collect_links,
     block_to_block_type,
     markdown_to_html_node,
+    block_to_html_node,
+    block_cache_info,
+    clear_block_cache,
     extract_title,
     BlockType
 )
@@ -238,6 +249,59 @@ class TestInlineMarkdown(unittest.TestCase):
             ],
         )
 
+    def test_single_pass_matches_chained(self):
+        samples = [
+            "",
+            "plain text",
+            "Here `code` and **bold** and _ital_",
+            "prefix ![a](i) mid [b](u) suffix",
+            "before **bold _ital_ end** after",
+            "a``b ****c",
+            "***a***",
+            "![a](b)[c](d)![e](f)",
+            "!![a](b) and ![x] [y](z)",
+            "[a_b](c)_",
+            "`**not bold**` and **x**",
+            "link [with `code`](u) inside",
+            "([a](![)a(bbxa]()",
+            "[a](b![c) d](e) then [f](g)",
+            "**x** [a*b](c*d) ![e](f) _y_ [g](h)",
+            "See [this page](/a) and [that one](/b). " * 50,
+        ]
+        for s in samples:
+            with self.subTest(s=s):
+                self.assertEqual(text_to_textnodes_single_pass(s), text_to_textnodes_chained(s))
+
+    def test_single_pass_raises_like_chained(self):
+        for s in ["unclosed `code", "**a `b` c**", "_a **b** c_", "an _italic"]:
+            with self.subTest(s=s):
+                with self.assertRaises(Exception):
+                    text_to_textnodes_chained(s)
+                with self.assertRaises(Exception):
+                    text_to_textnodes_single_pass(s)
+
+    def test_set_inline_tokenizer(self):
+        try:
+            set_inline_tokenizer("chained")
+            self.assertEqual(text_to_textnodes("**b**"), [TextNode("b", TextType.BOLD)])
+            with self.assertRaises(ValueError):
+                set_inline_tokenizer("nope")
+        finally:
+            set_inline_tokenizer("single_pass")
+
+    def test_set_inline_tokenizer_bypasses_cached_blocks(self):
+        md = "# Title\n\nA **bold** paragraph"
+        markdown_to_html_node(md)
+        calls = []
+        INLINE_TOKENIZERS["counting"] = lambda text: calls.append(text) or text_to_textnodes_chained(text)
+        try:
+            set_inline_tokenizer("counting")
+            markdown_to_html_node(md)
+            self.assertEqual(calls, ["A **bold** paragraph"])
+        finally:
+            del INLINE_TOKENIZERS["counting"]
+            set_inline_tokenizer("single_pass")
+
     def test_markdown_to_blocks(self):
         md = """
 This is **bolded** paragraph
@@ -296,6 +360,43 @@ This is the same paragraph on a new line
         blocks = markdown_to_blocks(markdown)
         self.assertEqual(blocks, ["First", "Second"])
 
+    def test_iter_markdown_blocks_matches_markdown_to_blocks(self):
+        md = "# Title\n\n\n\n para one\nline two \n\n   \n\n- a\n- b\n\n\n"
+        expected = markdown_to_blocks(md)
+        self.assertEqual(list(iter_markdown_blocks(md)), expected)
+        self.assertEqual(list(iter_markdown_blocks(md.encode())), expected)
+        for chunk_size in (1, 2, 5, 1024):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(list(iter_markdown_blocks(io.StringIO(md), chunk_size)), expected)
+                self.assertEqual(list(iter_markdown_blocks(io.BytesIO(md.encode()), chunk_size)), expected)
+
+    def test_iter_markdown_blocks_decodes_split_characters(self):
+        md = "# Éowyn\n\nDernhelm ✓"
+        blocks = list(iter_markdown_blocks(io.BytesIO(md.encode()), chunk_size=1))
+        self.assertEqual(blocks, ["# Éowyn", "Dernhelm ✓"])
+
+    def test_iter_markdown_blocks_is_lazy(self):
+        blocks = iter_markdown_blocks(io.StringIO("one\n\ntwo"))
+        self.assertEqual(next(blocks), "one")
+
+    def test_block_stream_matches_markdown_to_html_node(self):
+        md = "# Heading\n\nParagraph with **bold**\n\n- List1\n- List2"
+        stream = BlockStream(iter_markdown_blocks(io.StringIO(md)))
+        self.assertEqual(stream.to_html(), markdown_to_html_node(md).to_html())
+
+    def test_block_stream_collects_links(self):
+        md = "# [Home](/)\n\nSee [Tom](/blog/tom) and ![Tom](/images/tom.png)\n\n- [one](a)\n- [two](b)"
+        links = []
+        BlockStream(iter_markdown_blocks(md), links).to_html()
+        self.assertEqual(links, [("a", "/blog/tom"), ("img", "/images/tom.png"), ("a", "a"), ("a", "b")])
+        from_tree = []
+        collect_links(markdown_to_html_node(md), from_tree)
+        self.assertEqual(from_tree, links)
+
+    def test_block_stream_empty_raises(self):
+        with self.assertRaises(Exception):
+            BlockStream(iter([])).to_html()
+
     def test_blocktype_paragraph(self):
         md = "This is **bolded** paragraph"
         blocks = markdown_to_blocks(md)
@@ -426,6 +527,19 @@ This is the same paragraph on a new line
         blocks = markdown_to_blocks(md)
         self.assertEqual(block_to_block_type(blocks[0]), BlockType.ORDERED_LIST)
 
+    def test_blocktype_list_with_blank_lines(self):
+        self.assertEqual(block_to_block_type("- a\n\n- b"), BlockType.UNORDERED_LIST)
+        self.assertEqual(block_to_block_type("> a\n   \n> b"), BlockType.QUOTE)
+        self.assertEqual(block_to_block_type("1. a\n\n2. b"), BlockType.PARAGRAPH)
+
+    def test_blocktype_leading_whitespace_line(self):
+        self.assertEqual(block_to_block_type("  \n- a\n- b"), BlockType.UNORDERED_LIST)
+        self.assertEqual(block_to_block_type(" - a\n- b"), BlockType.PARAGRAPH)
+
+    def test_blocktype_ordered_list_needs_exact_numbers(self):
+        self.assertEqual(block_to_block_type("01. a\n02. b"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("1. a\n2. b\n3.c"), BlockType.PARAGRAPH)
+
     def test_markdown_to_html_node_paragraph(self):
         md = "This is a simple paragraph."
         node = markdown_to_html_node(md)
@@ -449,6 +563,16 @@ This is the same paragraph on a new line
         self.assertEqual(node.children[0].children[0].tag, "code")
         self.assertIn("print('hello')", node.children[0].children[0].to_html())
 
+    def test_markdown_to_html_node_code_strips_fences(self):
+        md = "```python\nif a < b:\n    return\n```"
+        node = markdown_to_html_node(md)
+        self.assertEqual(node.to_html(), "<div><pre><code>if a &lt; b:\n    return\n</code></pre></div>")
+
+    def test_markdown_to_html_node_code_keeps_inline_markup(self):
+        md = "```\nThis is _not_ **bold** or `code`\n```"
+        node = markdown_to_html_node(md)
+        self.assertEqual(node.to_html(), "<div><pre><code>This is _not_ **bold** or `code`\n</code></pre></div>")
+
     def test_markdown_to_html_node_quote(self):
         md = "> This is a quote\n> with two lines"
         node = markdown_to_html_node(md)
@@ -494,6 +618,21 @@ This is the same paragraph on a new line
         node = markdown_to_html_node(md)
         self.assertEqual([c.tag for c in node.children], ["h1", "p", "pre", "blockquote"])
 
+    def test_repeated_blocks_hit_block_cache(self):
+        clear_block_cache()
+        footer = "_This page is not affiliated with the Tolkien Estate._"
+        first = markdown_to_html_node(f"# One\n\n{footer}")
+        second = markdown_to_html_node(f"# Two\n\n{footer}")
+        self.assertIs(first.children[1], second.children[1])
+        self.assertEqual(second.to_html(), "<div><h1>Two</h1><p><i>This page is not affiliated with the Tolkien Estate.</i></p></div>")
+        info = block_cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 3))
+
+    def test_block_cache_clear(self):
+        block_to_html_node("- cached item")
+        clear_block_cache()
+        self.assertEqual(block_cache_info().currsize, 0)
+
     def test_extract_title_found(self):
         md = "# Heading\n\nParagraph\n\n```code block```\n\n> Quote"
         header = extract_title(md)
@@ -0,0 +1,153 @@
+import os
+import mmap
+import hashlib
+import unittest
+
+import profiling
+from pageio import AtomicWriter, atomic_file, open_source, read_text, temp_path, write_text
+from markdown_split import iter_markdown_blocks, markdown_to_blocks
+from fixtures import TempDirTestCase
+
+
+class TestReadText(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.root, "page.md")
+
+    def test_reads_small_and_mapped_files_alike(self):
+        self.write("page.md", "# Héllo\n\nwörld ✓\n".encode("utf-8"))
+        self.assertEqual(read_text(self.path), "# Héllo\n\nwörld ✓\n")
+        self.assertEqual(read_text(self.path, threshold=1), "# Héllo\n\nwörld ✓\n")
+
+    def test_empty_file(self):
+        self.write("page.md", b"")
+        self.assertEqual(read_text(self.path, threshold=0), "")
+
+    def test_normalizes_newlines_like_text_mode(self):
+        self.write("page.md", b"# A\r\n\r\nb\rc\n")
+        with open(self.path, "r") as f:
+            expected = f.read()
+        self.assertEqual(read_text(self.path), expected)
+        self.assertEqual(read_text(self.path, threshold=1), expected)
+
+    def test_digest_is_fed_the_raw_bytes(self):
+        data = "# Héllo\r\n\r\nwörld\r\n".encode("utf-8")
+        self.write("page.md", data)
+        for threshold in (1024, 1):
+            digest = hashlib.sha256()
+            self.assertEqual(read_text(self.path, threshold=threshold, digest=digest), "# Héllo\n\nwörld\n")
+            self.assertEqual(digest.hexdigest(), hashlib.sha256(data).hexdigest())
+
+    def test_rejects_invalid_utf8(self):
+        self.write("page.md", b"\xff\xfe")
+        with self.assertRaises(UnicodeDecodeError):
+            read_text(self.path)
+
+
+class TestOpenSource(TempDirTestCase):
+    def blocks(self, data, threshold):
+        with open_source(self.write("page.md", data), threshold=threshold) as source:
+            return type(source), list(iter_markdown_blocks(source))
+
+    def test_small_files_are_decoded(self):
+        kind, blocks = self.blocks("# Tïtle\n\npara\n".encode("utf-8"), threshold=1024)
+        self.assertIs(kind, str)
+        self.assertEqual(blocks, ["# Tïtle", "para"])
+
+    def test_large_files_are_mapped(self):
+        markdown = "# Tïtle\n\n" + "\n\n".join(f"paragraph {i}" for i in range(100))
+        kind, blocks = self.blocks(markdown.encode("utf-8"), threshold=1)
+        self.assertIs(kind, mmap.mmap)
+        self.assertEqual(blocks, markdown_to_blocks(markdown))
+
+    def test_large_files_with_crlf_are_normalized(self):
+        kind, blocks = self.blocks(b"# Title\r\n\r\npara\r\n", threshold=1)
+        self.assertIs(kind, str)
+        self.assertEqual(blocks, ["# Title", "para"])
+
+
+class TestAtomicWriter(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.root, "index.html")
+
+    def read(self):
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def test_writes_fragments_in_chunks(self):
+        with AtomicWriter(self.path, buffer_size=8) as out:
+            for i in range(100):
+                out.write(f"<p>{i} é</p>")
+        self.assertEqual(self.read(), "".join(f"<p>{i} é</p>" for i in range(100)).encode("utf-8"))
+        self.assertEqual(os.listdir(self.root), ["index.html"])
+
+    def test_file_appears_only_on_commit(self):
+        write_text(self.path, "old")
+        with AtomicWriter(self.path, buffer_size=4) as out:
+            out.write("new content")
+            # Flushed to the temporary file, but readers still see the old page
+            self.assertEqual(self.read(), b"old")
+        self.assertEqual(self.read(), b"new content")
+
+    def test_error_keeps_previous_file(self):
+        write_text(self.path, "old")
+        with self.assertRaises(RuntimeError):
+            with AtomicWriter(self.path, buffer_size=4) as out:
+                out.write("half a page")
+                raise RuntimeError("render failed")
+        self.assertEqual(self.read(), b"old")
+        self.assertEqual(os.listdir(self.root), ["index.html"])
+
+    def test_flushes_are_timed_as_writes(self):
+        profiling.enable()
+        try:
+            with profiling.current_page("page.md"), AtomicWriter(self.path, buffer_size=4) as out:
+                out.write("early flush")
+                out.write("tail")
+        finally:
+            events = profiling.disable()
+        # One flush per full buffer while rendering, then the commit
+        self.assertEqual([(name, page) for name, page, *_ in events], [("write", "page.md")] * 3)
+
+    def test_replaces_rather_than_rewrites(self):
+        # A hard-linked output, e.g. from a shard merge, is not modified through the link
+        write_text(self.path, "shared")
+        linked = os.path.join(self.root, "linked.html")
+        os.link(self.path, linked)
+        write_text(self.path, "new")
+        with open(linked, "rb") as f:
+            self.assertEqual(f.read(), b"shared")
+        self.assertEqual(self.read(), b"new")
+
+
+class TestAtomicFile(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.root, "manifest.json")
+
+    def test_replaces_on_success(self):
+        with atomic_file(self.path) as f:
+            f.write("{}")
+        with atomic_file(self.path, "wb") as f:
+            f.write(b"[]")
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), b"[]")
+        self.assertEqual(os.listdir(self.root), ["manifest.json"])
+
+    def test_error_removes_temp_file(self):
+        write_text(self.path, "old")
+        with self.assertRaises(TypeError):
+            with atomic_file(self.path) as f:
+                f.write("partial")
+                f.write(b"not text")
+        self.assertEqual(read_text(self.path), "old")
+        self.assertEqual(os.listdir(self.root), ["manifest.json"])
+
+    def test_temp_paths_are_unique(self):
+        # Two writers of the same file, e.g. the daemon and a CLI build, never share a temp file
+        self.assertNotEqual(temp_path(self.path), temp_path(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import io
 import unittest
 
 from htmlnode import ParentNode, LeafNode
@@ -41,6 +42,27 @@ class TestParentNode(unittest.TestCase):
         # ParentNode.to_html does not include props in tag output
         self.assertEqual(node.to_html(), "<div><span>x</span></div>")
 
+    def test_render_into_matches_to_html(self):
+        inner = ParentNode("li", [LeafNode(None, "item"), LeafNode("a", "x", {"href": "/y"})])
+        outer = ParentNode("ul", [inner, inner])
+        parts = []
+        outer.render_into(parts.append)
+        self.assertEqual("".join(parts), outer.to_html())
+        buf = io.StringIO()
+        outer.render_into(buf.write)
+        self.assertEqual(buf.getvalue(), outer.to_html())
+
+    def test_deeply_nested_renders(self):
+        node = LeafNode("b", "x")
+        for _ in range(200):
+            node = ParentNode("span", [node])
+        self.assertEqual(node.to_html(), "<span>" * 200 + "<b>x</b>" + "</span>" * 200)
+
+    def test_render_into_raises_on_invalid_child(self):
+        node = ParentNode("div", [LeafNode("p", None)])
+        with self.assertRaises(Exception):
+            node.render_into([].append)
+
 
 if __name__ == "__main__":
     unittest.main()
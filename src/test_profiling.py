@@ -0,0 +1,77 @@
+import os
+import json
+import tempfile
+import unittest
+
+import profiling
+
+
+class TestProfiling(unittest.TestCase):
+    def tearDown(self):
+        profiling.disable()
+
+    def test_disabled_stage_records_nothing(self):
+        self.assertFalse(profiling.enabled())
+        with profiling.stage("read", "a.md"):
+            pass
+        self.assertIs(profiling.stage("read"), profiling.stage("write"))
+        self.assertEqual(profiling.disable(), [])
+
+    def test_enabled_stage_records_events(self):
+        profiling.enable()
+        with profiling.stage("read", "a.md"):
+            pass
+        with profiling.stage("write", "a.md"):
+            pass
+        events = profiling.disable()
+        self.assertEqual([(name, page) for name, page, *_ in events], [("read", "a.md"), ("write", "a.md")])
+        self.assertTrue(all(event[3] >= 0 and event[5] == os.getpid() for event in events))
+
+    def test_timed_and_timed_iter(self):
+        profiling.enable()
+        double = profiling.timed("render", lambda x: 2 * x)
+        with profiling.current_page("a.md"):
+            self.assertEqual([double(x) for x in profiling.timed_iter("block-split", [1, 2])], [2, 4])
+            with profiling.stage("read", "b.md"):
+                pass
+        with profiling.stage("discover"):
+            pass
+        events = profiling.disable()
+        self.assertEqual([(name, page) for name, page, *_ in events], [
+            ("block-split", "a.md"), ("render", "a.md"), ("block-split", "a.md"), ("render", "a.md"),
+            ("block-split", "a.md"), ("read", "b.md"), ("discover", None),
+        ])
+
+    def test_add_events_merges_other_processes(self):
+        profiling.enable()
+        profiling.add_events([("render", "b.md", 0, 10, 1, 1234)])
+        self.assertEqual(len(profiling.disable()), 1)
+
+    def test_aggregate_and_per_page(self):
+        events = [
+            ("write", "a.md", 0, 30, 1, 1),
+            ("read", "a.md", 0, 10, 2, 1),
+            ("read", "b.md", 0, 20, 3, 1),
+            ("discover", None, 0, 5, 0, 1),
+        ]
+        self.assertEqual(list(profiling.aggregate(events)), ["discover", "read", "write"])
+        self.assertEqual(profiling.aggregate(events)["read"], (2, 30, 5))
+        self.assertEqual(profiling.per_page(events), {"a.md": {"write": 30, "read": 10}, "b.md": {"read": 20}})
+        table = profiling.summary_table(events)
+        self.assertIn("read", table)
+        self.assertIn("slowest pages (of 2)", table)
+
+    def test_write_trace(self):
+        events = [("read", "a.md", 5_000, 2_000, 1, 7), ("discover", None, 1_000, 1_000, 0, 7)]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.json")
+            profiling.write_trace(events, path)
+            with open(path) as f:
+                trace = json.load(f)
+        first = trace["traceEvents"][0]
+        self.assertEqual((first["name"], first["ph"], first["ts"], first["dur"]), ("read", "X", 4.0, 2.0))
+        self.assertEqual(first["args"], {"allocated_blocks": 1, "page": "a.md"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+
+from markdown_split import markdown_to_html_node
+from render import render_document, render_many
+
+
+DOCS = [
+    ("home", "# Home\n\nWelcome **back**"),
+    ("no-title", "Just a paragraph"),
+    ("post", "# Post\n\n- one\n- two"),
+    ("empty", ""),
+]
+
+
+class TestRender(unittest.TestCase):
+    def test_render_document(self):
+        self.assertEqual(render_document(DOCS[0][1]), ("Home", markdown_to_html_node(DOCS[0][1]).to_html()))
+
+    def test_render_many_captures_errors(self):
+        results = list(render_many(DOCS))
+        self.assertEqual([result[0] for result in results], ["home", "no-title", "post", "empty"])
+        self.assertEqual(results[0][1:], ("Home", "<div><h1>Home</h1><p>Welcome <b>back</b></p></div>", None))
+        self.assertEqual(results[2][1], "Post")
+        for doc_id, title, html, error in (results[1], results[3]):
+            self.assertEqual((title, html), (None, None))
+            self.assertIsInstance(error, Exception)
+
+    def test_render_many_is_lazy(self):
+        def docs():
+            yield DOCS[0]
+            raise AssertionError("read past the first document")
+        self.assertEqual(next(render_many(docs()))[1], "Home")
+
+    def test_render_many_parallel_matches_serial(self):
+        docs = [(i, f"# Doc {i}\n\nBody *{i}*") for i in range(50)] + DOCS
+        serial = list(render_many(docs))
+        parallel = list(render_many(iter(docs), jobs=2, chunksize=8))
+        self.assertEqual([result[:3] for result in parallel], [result[:3] for result in serial])
+        self.assertEqual([result[3] is None for result in parallel], [result[3] is None for result in serial])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import unittest
+
+import render_cache
+from render_cache import RenderCache, parser_version
+from fixtures import TempDirTestCase
+
+
+class TestRenderCache(TempDirTestCase):
+    def test_miss_then_hit(self):
+        cache = RenderCache(self.root)
+        self.assertIsNone(cache.get("# Title"))
+        cache.put("# Title", "Title", "<div><h1>Title</h1></div>", [("a", "/")])
+        self.assertEqual(cache.get("# Title"), ("Title", "<div><h1>Title</h1></div>", [("a", "/")]))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_persists_across_instances(self):
+        RenderCache(self.root).put("# A", "A", "<h1>A</h1>")
+        self.assertEqual(RenderCache(self.root).get("# A"), ("A", "<h1>A</h1>", []))
+
+    def test_entries_live_under_parser_version(self):
+        cache = RenderCache(self.root)
+        self.assertEqual(os.path.basename(cache.directory), parser_version())
+
+    def test_other_parser_versions_are_dropped(self):
+        stale = os.path.join(self.root, "0000000000000000")
+        os.makedirs(stale)
+        RenderCache(self.root)
+        self.assertFalse(os.path.exists(stale))
+
+    def test_lru_eviction(self):
+        cache = RenderCache(self.root, max_bytes=600)
+        for i in range(4):
+            cache.put(f"# {i}", str(i), "x" * 100)
+            # Distinct mtimes make the eviction order deterministic
+            path = cache._path(f"# {i}")
+            os.utime(path, ns=(0, i * 1_000_000_000))
+        cache.get("# 0")  # refresh the oldest entry
+        for i in range(4, 6):
+            cache.put(f"# {i}", str(i), "x" * 100)
+        self.assertLessEqual(cache.size, 600)
+        self.assertIsNotNone(cache.get("# 0"))
+        self.assertIsNone(cache.get("# 1"))
+        self.assertIsNotNone(cache.get("# 5"))
+
+    def test_open_cache_is_reused(self):
+        try:
+            self.assertIs(render_cache.open_cache(self.root), render_cache.open_cache(self.root))
+        finally:
+            render_cache._open_caches.pop(self.root, None)
+
+
+if __name__ == "__main__":
+    unittest.main()
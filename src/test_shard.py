@@ -0,0 +1,94 @@
+import os
+import unittest
+
+from shard import (
+    parse_shard,
+    shard_of,
+    shard_root,
+    save_shard_manifest,
+    load_shard_manifests,
+)
+from fixtures import TempDirTestCase
+
+
+class TestShardAssignment(unittest.TestCase):
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/8"), (2, 8))
+        for spec in ("8/8", "-1/2", "1/0", "1", "a/b", "1/2/3"):
+            with self.assertRaises(ValueError):
+                parse_shard(spec)
+
+    def test_shard_of_is_stable(self):
+        # Pinned values: every node, process and Python version must agree on them
+        self.assertEqual(shard_of("blog/tom/index.md", 1000), 983)
+        self.assertEqual(shard_of("index.md", 7), 1)
+        self.assertEqual(shard_of(os.path.join("blog", "tom", "index.md"), 1000), 983)
+
+    def test_shards_partition_the_site(self):
+        paths = [f"section-{i // 100}/page-{i % 100}/index.md" for i in range(1000)]
+        shards = [[path for path in paths if shard_of(path, 4) == index] for index in range(4)]
+        self.assertEqual(sorted(sum(shards, [])), sorted(paths))
+        self.assertTrue(all(150 < len(shard) < 350 for shard in shards))
+
+
+class TestShardManifests(TempDirTestCase):
+    def save(self, index, count, outputs, build_id=None):
+        root = shard_root(self.root, index)
+        os.makedirs(root, exist_ok=True)
+        save_shard_manifest(root, index, count, outputs, {output: [["a", "/"]] for output in outputs}, build_id)
+
+    def test_complete_set(self):
+        self.save(1, 2, ["b.html"])
+        self.save(0, 2, ["a.html", "index.css"])
+        manifests = load_shard_manifests(self.root)
+        self.assertEqual([manifest["index"] for manifest in manifests], [0, 1])
+        self.assertEqual(manifests[0]["outputs"], ["a.html", "index.css"])
+        self.assertEqual(manifests[1]["links"], {"b.html": [["a", "/"]]})
+
+    def test_missing_shard(self):
+        self.save(0, 3, ["a.html"])
+        self.save(2, 3, ["c.html"])
+        with self.assertRaisesRegex(ValueError, r"missing \[1\]"):
+            load_shard_manifests(self.root)
+
+    def test_mixed_counts(self):
+        self.save(0, 1, ["a.html"])
+        self.save(1, 2, ["b.html"])
+        with self.assertRaisesRegex(ValueError, "different shard counts"):
+            load_shard_manifests(self.root)
+
+    def test_overlapping_outputs(self):
+        self.save(0, 2, ["a.html"])
+        self.save(1, 2, ["a.html"])
+        with self.assertRaisesRegex(ValueError, "built by shards 0 and 1"):
+            load_shard_manifests(self.root)
+
+    def test_empty(self):
+        with self.assertRaises(ValueError):
+            load_shard_manifests(self.root)
+        with self.assertRaises(ValueError):
+            load_shard_manifests(os.path.join(self.root, "missing"))
+
+    def test_ignores_other_builds(self):
+        # A 3-shard run followed by a 2-shard one leaves shard-2 behind
+        for index in range(3):
+            self.save(index, 3, [f"{index}.html"], build_id="old")
+        for index in range(2):
+            self.save(index, 2, [f"{index}.html"], build_id="new")
+        manifests = load_shard_manifests(self.root, build_id="new")
+        self.assertEqual([(manifest["index"], manifest["count"]) for manifest in manifests], [(0, 2), (1, 2)])
+        with self.assertRaisesRegex(ValueError, "different shard counts"):
+            load_shard_manifests(self.root)
+
+    def test_failed_shard_is_not_reused(self):
+        self.save(0, 2, ["a.html"], build_id="old")
+        self.save(1, 2, ["b.html"], build_id="old")
+        self.save(0, 2, ["a.html"], build_id="new")
+        with self.assertRaisesRegex(ValueError, r"missing \[1\]"):
+            load_shard_manifests(self.root, build_id="new")
+        with self.assertRaisesRegex(ValueError, "no shard manifests of build 'other'"):
+            load_shard_manifests(self.root, build_id="other")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import unittest
+from graphlib import CycleError
+
+from sitegraph import SiteGraph, build_graph, linked_static_files
+from manifest import file_digest
+from fixtures import TempDirTestCase
+
+
+class TestLinkedStaticFiles(unittest.TestCase):
+    def test_resolves_image_urls_into_static(self):
+        markdown = (
+            "![abs](/images/tom.png) ![rel](../../images/a%20b.png) ![here](pic.png)\n"
+            "![ext](https://example.com/x.png) ![out](../../../etc/passwd) [link](/images/no.png)"
+        )
+        files = linked_static_files(markdown, "public/blog/tom/index.html", "public", "static")
+        self.assertEqual(files, {
+            os.path.join("static", "images", "tom.png"),
+            os.path.join("static", "images", "a b.png"),
+            os.path.join("static", "blog", "tom", "pic.png"),
+        })
+
+
+class TestSiteGraph(TempDirTestCase):
+    def page(self, name, markdown, template="template.html"):
+        from_path = self.write(os.path.join("content", name + ".md"), markdown)
+        return (from_path, template, os.path.join("public", name + ".html"))
+
+    def test_dependencies_and_affected(self):
+        home = self.page("index", "# Home\n\n![me](/images/me.png)")
+        post = self.page("blog/post", "# Post", template="blog.html")
+        graph = build_graph([home, post], "static", "public")
+        self.assertEqual(graph.dependencies["public/index.html"],
+                         {home[0], "template.html", os.path.join("static", "images", "me.png")})
+        self.assertEqual(graph.affected([os.path.join("static", "images", "me.png")]), {"public/index.html"})
+        self.assertEqual(graph.affected(["blog.html"]), {"public/blog/post.html"})
+        self.assertEqual(graph.affected([post[0]]), {"public/blog/post.html"})
+        self.assertEqual(graph.affected(["unrelated.css"]), set())
+
+    def test_sync_pages(self):
+        home = self.page("index", "# Home")
+        post = self.page("post", "# Post")
+        graph = build_graph([home, post], "static", "public")
+        moved = post[:1] + ("section.html",) + post[2:]
+        self.assertEqual(graph.sync_pages([moved]), ["public/index.html"])
+        self.assertEqual(set(graph.pages), {"public/post.html"})
+        self.assertEqual(graph.affected(["template.html"]), set())
+        self.assertEqual(graph.affected(["section.html"]), {"public/post.html"})
+        self.assertNotIn(home[0], graph.sources)
+
+    def test_digests_match_file_digest(self):
+        home = self.page("index", "# Home\r\n\r\nCRLF é")
+        post = self.page("post", "# Post")
+        graph = build_graph([home, post], "static", "public")
+        self.assertEqual(graph.digests, {path: file_digest(path) for path in (home[0], post[0])})
+        graph.sync_pages([post])
+        self.assertEqual(list(graph.digests), [post[0]])
+
+    def test_schedule_orders_dependencies_first(self):
+        graph = SiteGraph("static", "public")
+        graph.add_page(("a.md", "t.html", "a.html"), markdown="# A")
+        graph.add_page(("b.md", "a.html", "b.html"), markdown="# B")
+        graph.add_page(("c.md", "t.html", "c.html"), markdown="# C")
+        self.assertEqual(list(graph.schedule(["a.html", "b.html", "c.html"])), [["a.html", "c.html"], ["b.html"]])
+        self.assertEqual(graph.affected(["t.html"]), {"a.html", "b.html", "c.html"})
+
+    def test_schedule_rejects_cycles(self):
+        graph = SiteGraph("static", "public")
+        graph.add_page(("a.md", "b.html", "a.html"), markdown="# A")
+        graph.add_page(("b.md", "a.html", "b.html"), markdown="# B")
+        with self.assertRaises(CycleError):
+            list(graph.schedule(["a.html", "b.html"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
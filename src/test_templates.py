@@ -0,0 +1,59 @@
+import os
+import unittest
+
+from htmlnode import ParentNode, LeafNode
+from templates import Template, load_template, clear_template_cache, template_for
+from fixtures import TempDirTestCase
+
+
+class TestTemplate(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        clear_template_cache()
+
+    def test_parses_literals_and_slots(self):
+        template = Template("<title>{{ Title }}</title><article>{{ Content }}</article>")
+        self.assertEqual(template.literals, ["<title>", "</title><article>", "</article>"])
+        self.assertEqual([name for name, _ in template.slots], ["Title", "Content"])
+
+    def test_render_matches_replace(self):
+        source = "<title>{{ Title }}</title><article>{{ Content }}</article>"
+        template = Template(source)
+        expected = source.replace("{{ Title }}", "Hi").replace("{{ Content }}", "<p>x</p>")
+        self.assertEqual(template.render({"Title": "Hi", "Content": "<p>x</p>"}), expected)
+
+    def test_render_streams_nodes(self):
+        template = Template("<main>{{ Content }}</main>")
+        node = ParentNode("div", [LeafNode("p", "x")])
+        self.assertEqual(template.render({"Content": node}), "<main><div><p>x</p></div></main>")
+
+    def test_arbitrary_and_missing_slots(self):
+        template = Template("{{ Title }} by {{ Author }} on {{Date}}")
+        self.assertEqual(template.names, {"Title", "Author", "Date"})
+        self.assertEqual(template.render({"Title": "T", "Author": "A"}), "T by A on {{Date}}")
+
+    def test_no_slots(self):
+        self.assertEqual(Template("<p>static</p>").render({}), "<p>static</p>")
+
+    def test_load_template_is_cached_until_mtime_changes(self):
+        path = self.write("template.html", "<b>{{ Title }}</b>")
+        first = load_template(path)
+        self.assertIs(load_template(path), first)
+        self.write("template.html", "<i>{{ Title }}</i>")
+        os.utime(path, ns=(1, os.stat(path).st_mtime_ns + 1_000_000_000))
+        second = load_template(path)
+        self.assertIsNot(second, first)
+        self.assertEqual(second.render({"Title": "x"}), "<i>x</i>")
+
+    def test_template_for_uses_nearest_section_template(self):
+        content = os.path.join(self.root, "content")
+        default = self.write("template.html", "")
+        blog_template = self.write("content/blog/template.html", "")
+        tom = self.write("content/blog/tom/index.md", "# Tom")
+        index = self.write("content/index.md", "# Home")
+        self.assertEqual(template_for(tom, content, default), blog_template)
+        self.assertEqual(template_for(index, content, default), default)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -35,6 +35,12 @@ class TestTextNode(unittest.TestCase):
         self.assertEqual(node_enum, node_str)
         self.assertIs(node_str.text_type, TextType.IMAGE)
 
+    def test_nodes_are_slotted(self):
+        node = TextNode("t", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+        with self.assertRaises(AttributeError):
+            node.extra = 1
+
     def test_invalid_text_type_raises_valueerror(self):
         with self.assertRaises(ValueError):
             TextNode("t", "not-a-type")
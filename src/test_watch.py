@@ -0,0 +1,62 @@
+import os
+import logging
+import threading
+import unittest
+import urllib.request
+
+from watch import snapshot, diff_snapshots, serve, watch
+from fixtures import TempDirTestCase
+
+
+class TestWatch(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def test_snapshot_includes_files_and_single_file_roots(self):
+        page = self.write("content/blog/index.md", "# Blog")
+        template = self.write("template.html", "{{ Content }}")
+        files = snapshot([os.path.join(self.root, "content"), template, os.path.join(self.root, "missing")])
+        self.assertEqual(set(files), {page, template})
+
+    def test_diff_snapshots(self):
+        old = {"a": (1, 1), "b": (1, 1), "c": (1, 1)}
+        new = {"a": (1, 1), "b": (2, 1), "d": (1, 1)}
+        self.assertEqual(diff_snapshots(old, new), ({"b", "d"}, {"c"}))
+
+    def test_watch_reports_changes(self):
+        content = os.path.join(self.root, "content")
+        os.makedirs(content)
+        stop = threading.Event()
+        seen = []
+
+        def on_change(changed, removed):
+            seen.append((changed, removed))
+            stop.set()
+
+        thread = threading.Thread(target=watch, args=([content], on_change), kwargs={"interval": 0.02, "stop": stop})
+        thread.start()
+        # Give the watcher its initial snapshot before editing
+        threading.Event().wait(0.1)
+        page = self.write("content/index.md", "# Home")
+        thread.join(timeout=5)
+        stop.set()
+        self.assertEqual(seen, [({page}, set())])
+
+    def test_serve(self):
+        self.write("public/index.html", "<p>hi</p>")
+        server = serve(os.path.join(self.root, "public"), port=0)
+        try:
+            port = server.server_address[1]
+            with urllib.request.urlopen(f"http://localhost:{port}/") as response:
+                self.assertEqual(response.read(), b"<p>hi</p>")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -11,9 +11,12 @@ class TextType(Enum):
 
 
 class TextNode():
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type: TextType, url=None):
         self.text = text
-        self.text_type = TextType(text_type)
+        # Only coerce when needed, the parser always passes TextType members
+        self.text_type = text_type if type(text_type) is TextType else TextType(text_type)
         self.url = url
     
 
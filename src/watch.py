@@ -0,0 +1,83 @@
+import os
+import time
+import logging
+import threading
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+logger = logging.getLogger(__name__)
+
+
+def snapshot(roots):
+    """
+    Returns {path: (mtime_ns, size)} for every file below the given roots.
+    A root may also be a single file, such as template.html.
+    """
+    files = {}
+    stack = []
+    for root in roots:
+        if os.path.isdir(root):
+            stack.append(root)
+        elif os.path.isfile(root):
+            stat = os.stat(root)
+            files[root] = (stat.st_mtime_ns, stat.st_size)
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    stack.append(entry.path)
+                elif entry.is_file():
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    files[entry.path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+def diff_snapshots(old, new):
+    """Returns (changed, removed): files added or modified, and files deleted."""
+    changed = {path for path, signature in new.items() if old.get(path) != signature}
+    removed = old.keys() - new.keys()
+    return changed, removed
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def serve(directory, host="localhost", port=8888):
+    """Serves directory over HTTP from a background thread and returns the server."""
+    handler = partial(_QuietHandler, directory=directory)
+    server = ThreadingHTTPServer((host, port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    logger.info("Serving %s at http://%s:%d/", directory, host, server.server_address[1])
+    return server
+
+
+def watch(roots, on_change, interval=0.25, stop=None):
+    """
+    Polls roots every interval seconds and calls on_change(changed, removed)
+    with the files that differ from the previous poll.
+
+    Errors raised by on_change are logged and the loop carries on, so a half-typed
+    edit does not stop the watcher. Runs until stop (a threading.Event) is set.
+    """
+    stop = stop or threading.Event()
+    previous = snapshot(roots)
+    while not stop.wait(interval):
+        current = snapshot(roots)
+        changed, removed = diff_snapshots(previous, current)
+        previous = current
+        if not changed and not removed:
+            continue
+        start = time.perf_counter()
+        try:
+            on_change(changed, removed)
+        except Exception as e:
+            logger.error("Rebuild failed: %s", e)
+            continue
+        logger.info("Rebuilt %d changed file(s) in %.1f ms",
+                    len(changed) + len(removed), (time.perf_counter() - start) * 1000)